@@ -9,6 +9,8 @@ import logging
 from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from app import models, schemas
@@ -22,6 +24,40 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _serialize_campaigns(campaigns: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Validate campaigns against schemas.Campaign and dump them as JSON data.
+
+    A campaign that fails validation is a server-side fault, so it surfaces
+    as a 500 rather than reaching the request validation handler as a 422.
+    """
+    try:
+        return [schemas.Campaign.model_validate(campaign).model_dump(mode="json") for campaign in campaigns]
+    except ValidationError as e:
+        logger.error(f"Error serializing campaign response: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while serializing the campaign",
+        )
+
+
+def _campaign_response(campaign: Any) -> JSONResponse:
+    """
+    Serialize a campaign straight to a JSONResponse.
+
+    Returning a response object skips FastAPI's jsonable_encoder pass and
+    the second response_model validation.
+    """
+    return JSONResponse(_serialize_campaigns([campaign])[0])
+
+
+def _campaigns_response(campaigns: List[Any]) -> JSONResponse:
+    """
+    Serialize a list of campaigns straight to a JSONResponse.
+    """
+    return JSONResponse(_serialize_campaigns(campaigns))
+
+
 @router.post("/", response_model=schemas.Campaign)
 def create_campaign_endpoint(
     *,
@@ -33,7 +69,7 @@ def create_campaign_endpoint(
     Create new campaign.
     """
     logger.info(f"Creating new campaign for user {current_user.id}")
-    return campaign_service.create_campaign(db, campaign_in, current_user.id)
+    return _campaign_response(campaign_service.create_campaign(db, campaign_in, current_user.id))
 
 
 @router.get("/", response_model=List[schemas.Campaign])
@@ -48,7 +84,9 @@ def read_campaigns(
     Retrieve campaigns.
     """
     logger.info(f"Retrieving campaigns for user {current_user.id}")
-    return campaign_service.get_campaigns(db, current_user.id, skip=skip, limit=limit)
+    return _campaigns_response(
+        campaign_service.get_campaigns(db, current_user.id, skip=skip, limit=limit)
+    )
 
 
 @router.get("/active", response_model=List[schemas.Campaign])
@@ -61,7 +99,7 @@ def read_active_campaigns(
     Retrieve active campaigns.
     """
     logger.info(f"Retrieving active campaigns for user {current_user.id}")
-    return campaign_service.get_active_campaigns(db, current_user.id)
+    return _campaigns_response(campaign_service.get_active_campaigns(db, current_user.id))
 
 
 @router.get("/{campaign_id}", response_model=schemas.Campaign)
@@ -86,7 +124,7 @@ def read_campaign(
     # Validate access
     validate_campaign_access(db, campaign.id, current_user.id)
     
-    return campaign
+    return _campaign_response(campaign)
 
 
 @router.put("/{campaign_id}", response_model=schemas.Campaign)
@@ -112,7 +150,7 @@ def update_campaign_endpoint(
     # Validate access
     validate_campaign_access(db, campaign.id, current_user.id)
     
-    return campaign_service.update_campaign(db, campaign_id, campaign_in)
+    return _campaign_response(campaign_service.update_campaign(db, campaign_id, campaign_in))
 
 
 @router.delete("/{campaign_id}", response_model=schemas.Campaign)
@@ -137,7 +175,7 @@ def delete_campaign_endpoint(
     # Validate access
     validate_campaign_access(db, campaign.id, current_user.id)
     
-    return campaign_service.delete_campaign(db, campaign_id)
+    return _campaign_response(campaign_service.delete_campaign(db, campaign_id))
 
 
 @router.post("/{campaign_id}/ab-testing", response_model=schemas.Campaign)
@@ -170,4 +208,6 @@ def configure_ab_testing_endpoint(
             detail="A/B testing requires at least two variants",
         )
     
-    return campaign_service.configure_ab_testing(db, campaign_id, ab_test_in.variants) 
\ No newline at end of file
+    return _campaign_response(
+        campaign_service.configure_ab_testing(db, campaign_id, ab_test_in.variants)
+    ) 
\ No newline at end of file
@@ -7,114 +7,291 @@ ensure consistent test setup.
 
 import os
 import json
+import random
 import uuid
+import httpx
 import pytest
-from typing import Dict, Generator, Any, List
+import pytest_asyncio
+from typing import AsyncGenerator, Callable, Dict, Generator, Any, List
 from unittest.mock import Mock, patch
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
 
 from app.core.config import settings
 from app.core import security
 from app.db.base import Base
-from app.api.deps import get_db
+from app.api.deps import get_current_user, get_db
+from app.api.api_v1.endpoints import emails as emails_endpoint
+from app.services import email_sender_service
+from app.db import session as db_session
 from app.main import app
 from app import crud, models, schemas
 
 
-# Use SQLite in-memory database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Swap bcrypt for passlib's plaintext scheme when PYTEST_FAST_AUTH is set.
+# Hashing still round-trips through pwd_context, so login tests keep working,
+# but fixtures no longer pay the bcrypt cost factor on every user they create.
+if os.environ.get("PYTEST_FAST_AUTH"):
+    security.pwd_context = CryptContext(schemes=["plaintext"], deprecated="auto")
+
+
+# Use SQLite in-memory database for testing unless TEST_DATABASE_URL points
+# at a real server (e.g. Postgres in CI).
+SQLALCHEMY_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "sqlite://")
+
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    # StaticPool hands every session the same connection, so the fixtures and
+    # the API's get_db override all see one in-process database. Pre-ping is
+    # pointless here since the connection never goes stale.
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+else:
+    # Pessimistic pooling so a stale server connection is replaced before a
+    # test uses it. Size the pool to roughly 2x the number of xdist workers.
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=int(os.environ.get("TEST_DB_POOL_SIZE", "5")),
+        max_overflow=int(os.environ.get("TEST_DB_MAX_OVERFLOW", "10")),
+        pool_recycle=1800,
+    )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-@pytest.fixture(scope="function")
-def db() -> Generator:
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+# pysqlite defers BEGIN and mishandles SAVEPOINT; let SQLAlchemy own the
+# transaction boundaries so the nested per-test rollbacks below work.
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _disable_pysqlite_transactions)
+    event.listen(engine, "begin", _emit_begin)
+
+
+@pytest.fixture(scope="session")
+def connection() -> Generator:
     """
-    Create a fresh database for each test, then drop all tables after the test.
+    Create the schema once and hold a single connection for the whole run.
+    
+    Everything created through this connection lives inside one outer
+    transaction that is rolled back when the session ends, so per-test
+    savepoints can be discarded without rebuilding the tables.
     
     Returns:
-        Generator yielding a SQLAlchemy Session
+        Generator yielding a SQLAlchemy Connection
     """
-    # Create the database
     Base.metadata.create_all(bind=engine)
     
-    # Create a new session for the test
-    db = TestingSessionLocal()
+    connection = engine.connect()
+    transaction = connection.begin()
+    try:
+        yield connection
+    finally:
+        transaction.rollback()
+        connection.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db(connection, session_campaign) -> Generator:
+    """
+    Provide a database session whose changes are rolled back after the test.
+    
+    The session joins the session-wide connection through a SAVEPOINT, so
+    commits issued by tests or endpoints only release nested savepoints and
+    never escape the per-test transaction.
+    
+    Depending on session_campaign (and through it session_user) makes sure
+    the shared seed rows are written before the savepoint opens. Otherwise
+    a test resolving them lazily via request.getfixturevalue would create
+    them inside its own savepoint and roll them back for every later test.
+    
+    Args:
+        connection: The session-scoped database connection
+        session_campaign: The session-scoped test campaign
+        
+    Returns:
+        Generator yielding a SQLAlchemy Session
+    """
+    nested = connection.begin_nested()
+    db = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
     try:
         yield db
     finally:
         db.close()
-        
-    # Drop all tables after the test
-    Base.metadata.drop_all(bind=engine)
+        if nested.is_active:
+            nested.rollback()
+
+
+@pytest.fixture(scope="session")
+def app_client() -> Generator:
+    """
+    Create the FastAPI TestClient once per test session.
+    
+    Entering the client runs the application's startup handlers, so sharing
+    it means they run once rather than for every test.
+    
+    Returns:
+        Generator yielding a FastAPI TestClient
+    """
+    with TestClient(app) as client:
+        yield client
 
 
 @pytest.fixture(scope="function")
-def client(db: Session) -> TestClient:
+def client(request, connection, app_client: TestClient) -> TestClient:
     """
-    Create a FastAPI TestClient with a dependency override for the database.
+    Provide the shared TestClient with a dependency override for the database.
+    
+    Tests marked ``no_db`` promise not to write to the database, so they get
+    a plain session on the shared connection instead of the per-test
+    savepoint set up by the ``db`` fixture. Cookies are cleared after each
+    test so authentication state does not leak between tests.
     
     Args:
-        db: The database session fixture
+        request: pytest request object
+        connection: The session-scoped database connection
+        app_client: The session-scoped TestClient
         
     Returns:
         A FastAPI TestClient
     """
+    read_only = request.node.get_closest_marker("no_db") is not None
+    if read_only:
+        db = TestingSessionLocal(bind=connection)
+    else:
+        db = request.getfixturevalue("db")
+
     def override_get_db() -> Generator:
         try:
             yield db
         finally:
             pass
 
+    # Some routes (e.g. health) depend on app.db.session.get_db directly
+    # rather than the deps wrapper, so override both entry points
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[db_session.get_db] = override_get_db
     
-    # Return the test client
-    with TestClient(app) as client:
-        yield client
+    yield app_client
     
-    # Clear dependency overrides after test
+    # Clear dependency overrides and client state after test
     app.dependency_overrides = {}
+    app_client.cookies.clear()
+    if read_only:
+        db.close()
+
+
+@pytest_asyncio.fixture
+async def async_client(client: TestClient) -> AsyncGenerator:
+    """
+    Provide an httpx AsyncClient that talks to the app in-process.
+    
+    Depends on ``client`` so the same database override and per-test
+    cleanup apply; requests are awaited on the test's event loop instead
+    of going through the TestClient's thread portal.
+    
+    Args:
+        client: The TestClient fixture that installs the overrides
+        
+    Returns:
+        AsyncGenerator yielding an httpx.AsyncClient
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        yield ac
+
+
+@pytest.fixture(scope="session")
+def session_user(connection) -> models.User:
+    """
+    Create the shared test user once per test session.
+    
+    The user is written into the session-wide transaction, so it survives
+    the per-test savepoint rollbacks and its password is only hashed once.
+    
+    Args:
+        connection: The session-scoped database connection
+        
+    Returns:
+        A detached User model instance with all attributes loaded
+    """
+    session = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        # Build the user with its SMTP settings up front so seeding is a
+        # single INSERT and commit rather than a create followed by an update
+        user = models.User(
+            email="testuser@example.com",
+            hashed_password=security.get_password_hash("password"),  # Simplified for testing
+            full_name="Test User",
+            smtp_host="smtp.example.com",
+            smtp_port="587",
+            smtp_user="smtp_user",
+            smtp_password="smtp_password",
+            smtp_use_tls=True
+        )
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+    finally:
+        session.close()
+    
+    return user
 
 
 @pytest.fixture(scope="function")
-def test_user(db: Session) -> models.User:
+def test_user(db: Session, session_user: models.User) -> models.User:
     """
-    Create a test user for authentication tests.
+    Load the shared test user into the current test's session.
+    
+    Changes made to the returned instance are rolled back with the test.
     
     Args:
         db: The database session fixture
+        session_user: The session-scoped test user
         
     Returns:
         A User model instance for testing
     """
-    user_in = schemas.UserCreate(
-        email="testuser@example.com",
-        password="password",  # Simplified for testing
-        full_name="Test User"
-    )
-    
-    # Create user with SMTP settings
-    user = crud.user.create(db, obj_in=user_in)
+    return db.get(models.User, session_user.id)
+
+
+@pytest.fixture(scope="function")
+def user_without_smtp(db: Session, test_user: models.User) -> models.User:
+    """
+    Provide the test user with its SMTP settings cleared.
     
-    # Update with SMTP settings
-    smtp_settings = {
-        "smtp_host": "smtp.example.com",
-        "smtp_port": "587",
-        "smtp_user": "smtp_user",
-        "smtp_password": "smtp_password",
-        "smtp_use_tls": True
-    }
-    user_update = schemas.UserUpdate(**smtp_settings)
-    user = crud.user.update(db, db_obj=user, obj_in=user_update)
+    The change is only flushed, so the per-test savepoint restores the
+    settings even when the test fails.
     
-    return user
+    Args:
+        db: The database session fixture
+        test_user: The test user fixture
+        
+    Returns:
+        A User model instance without SMTP credentials
+    """
+    test_user.smtp_host = None
+    test_user.smtp_user = None
+    test_user.smtp_password = None
+    db.flush()
+    return test_user
 
 
 @pytest.fixture(scope="function")
@@ -138,45 +315,146 @@ def test_superuser(db: Session) -> models.User:
     return user
 
 
-@pytest.fixture(scope="function")
-def test_campaign(db: Session, test_user: models.User) -> models.EmailCampaign:
+def _create_test_campaign(db: Session, user_id: uuid.UUID) -> models.EmailCampaign:
     """
-    Create a test campaign for the test user.
+    Create the standard test campaign for the given user.
     
     Args:
-        db: The database session fixture
-        test_user: The test user fixture
+        db: Database session to create the campaign in
+        user_id: ID of the owning user
         
     Returns:
         A Campaign model instance for testing
     """
-    campaign_in = schemas.CampaignCreate(
+    campaign = models.EmailCampaign(
         name="Test Campaign",
         description="Test campaign description",
-        target_audience="Test audience",
+        user_id=user_id,
         is_active=True
     )
-    campaign = crud.campaign.create_with_user(
-        db=db, obj_in=campaign_in, user_id=test_user.id
-    )
+    db.add(campaign)
+    db.commit()
+    db.refresh(campaign)
+    return campaign
+
+
+@pytest.fixture(scope="session")
+def session_campaign(connection, session_user: models.User) -> models.EmailCampaign:
+    """
+    Create the shared test campaign once per test session.
+    
+    Like session_user, the campaign is written into the session-wide
+    transaction, so every test sees it and per-test changes to it are
+    undone by the test's savepoint rollback.
+    
+    Args:
+        connection: The session-scoped database connection
+        session_user: The session-scoped test user
+        
+    Returns:
+        A detached Campaign model instance with all attributes loaded
+    """
+    session = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        campaign = _create_test_campaign(session, session_user.id)
+        session.expunge(campaign)
+    finally:
+        session.close()
+    
     return campaign
 
 
 @pytest.fixture(scope="function")
-def token_headers(test_user: models.User) -> Dict[str, str]:
+def test_campaign(db: Session, session_campaign: models.EmailCampaign) -> models.EmailCampaign:
+    """
+    Load the shared test campaign into the current test's session.
+    
+    Tests may modify or delete the returned instance; the changes are
+    rolled back with the test.
+    
+    Args:
+        db: The database session fixture
+        session_campaign: The session-scoped test campaign
+        
+    Returns:
+        A Campaign model instance for testing
+    """
+    return db.get(models.EmailCampaign, session_campaign.id)
+
+
+@pytest.fixture(scope="session")
+def readonly_test_campaign(session_campaign: models.EmailCampaign) -> models.EmailCampaign:
+    """
+    Provide the shared test campaign to read-only tests without a session.
+    
+    Tests using it must not modify or delete it.
+    
+    Args:
+        session_campaign: The session-scoped test campaign
+        
+    Returns:
+        A detached Campaign model instance
+    """
+    return session_campaign
+
+
+@pytest.fixture(scope="function")
+def active_campaign(db: Session, test_campaign: models.EmailCampaign) -> models.EmailCampaign:
+    """
+    Provide the test campaign flagged as active.
+    
+    The change is only flushed, so it stays inside the per-test savepoint.
+    
+    Args:
+        db: The database session fixture
+        test_campaign: The test campaign fixture
+        
+    Returns:
+        An active Campaign model instance for testing
+    """
+    test_campaign.is_active = True
+    db.flush()
+    return test_campaign
+
+
+@pytest.fixture(scope="session")
+def token_headers(session_user: models.User) -> Dict[str, str]:
     """
     Create authorization headers with JWT token for the test user.
     
+    The token is issued once per session and reused by every test.
+    
     Args:
-        test_user: The test user fixture
+        session_user: The session-scoped test user
         
     Returns:
         Headers dictionary with Authorization bearer token
     """
-    token = security.create_access_token(test_user.id)
+    token = security.create_access_token(session_user.id)
     return {"Authorization": f"Bearer {token}"}
 
 
+@pytest.fixture(scope="function")
+def current_user_override(client: TestClient, test_user: models.User) -> models.User:
+    """
+    Authenticate every request as the test user without decoding a token.
+    
+    Overrides the get_current_user dependency so requests skip JWT decoding
+    and the user lookup. Use it for tests that only need some authenticated
+    user; authentication tests should keep sending token_headers. The
+    override is cleared with the rest in the client fixture's teardown.
+    
+    Args:
+        client: The TestClient fixture that owns the dependency overrides
+        test_user: The test user fixture
+        
+    Returns:
+        The User model instance requests are authenticated as
+    """
+    app.dependency_overrides[get_current_user] = lambda: test_user
+    return test_user
+
+
 @pytest.fixture(scope="function")
 def superuser_token_headers(test_superuser: models.User) -> Dict[str, str]:
     """
@@ -345,35 +623,71 @@ def mock_email_generator(monkeypatch, mock_openai_response):
     return mock_generate
 
 
-@pytest.fixture(scope="function")
-def mock_smtp_client(monkeypatch):
+@pytest.fixture
+def ai_gen_patch(request) -> Generator:
     """
-    Mock the SMTP client used for sending emails.
+    Patch the email endpoint's generate_email with an indirect parameter.
+    
+    Use with ``@pytest.mark.parametrize("ai_gen_patch", [fn], indirect=True)``;
+    ``fn`` becomes the side effect. A ``None`` parameter leaves the function
+    unpatched. The patch targets the name bound in the already-imported
+    endpoint module, which is the reference the route actually calls.
     
     Args:
-        monkeypatch: pytest monkeypatch fixture
+        request: pytest request object carrying the side effect
         
     Returns:
-        A patched version of the send_email function that always succeeds
+        Generator yielding the patch mock, or None when unpatched
     """
-    async def mock_send_email_async(*args, **kwargs):
-        return True
+    side_effect = getattr(request, "param", None)
+    if side_effect is None:
+        yield None
+        return
+    with patch.object(emails_endpoint, "generate_email", side_effect=side_effect) as mock_generate:
+        yield mock_generate
+
+
+@pytest.fixture(scope="session")
+def _smtp_mock_singleton() -> Generator:
+    """
+    Patch the SMTP transport once for the whole session.
     
-    def mock_send_email(*args, **kwargs):
-        return True
+    The autospec'd aiosmtplib.SMTP keeps its async methods awaitable, so
+    send_email/send_email_async run their real message-building code and
+    stop at the mocked connection.
     
-    # Patch both sync and async email sending functions
-    monkeypatch.setattr("app.services.email_sender.send_email_async", mock_send_email_async)
-    monkeypatch.setattr("app.services.email_sender.send_email", mock_send_email)
+    Returns:
+        Generator yielding the patched SMTP class mock
+    """
+    with patch.object(email_sender_service.aiosmtplib, "SMTP", autospec=True) as mock_smtp:
+        yield mock_smtp
+
+
+@pytest.fixture(scope="function")
+def mock_smtp_client(_smtp_mock_singleton) -> Mock:
+    """
+    Mock the SMTP client used for sending emails.
+    
+    Hands out the session-wide SMTP patch with its call history cleared,
+    so each test only sees the connections it made.
     
-    return mock_send_email
+    Args:
+        _smtp_mock_singleton: The session-scoped SMTP class patch
+        
+    Returns:
+        The patched SMTP class; ``.return_value`` is the client instance
+    """
+    _smtp_mock_singleton.reset_mock()
+    return _smtp_mock_singleton
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_current_user() -> models.User:
     """
     Mock an authenticated user for testing endpoints that require authentication.
     
+    Shared across the session; tests must not modify it.
+    
     Returns:
         Mock User object
     """
@@ -386,11 +700,14 @@ def mock_current_user() -> models.User:
     return user
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def auth_headers(mock_current_user) -> Dict[str, str]:
     """
     Generate authentication headers for testing protected endpoints.
     
+    The token only depends on the session-scoped mock user, so it is signed
+    once per session; tests must not modify the returned dict.
+    
     Args:
         mock_current_user: Mock user fixture
         
@@ -416,6 +733,42 @@ def mock_db_session() -> Mock:
     return mock_session
 
 
+@pytest.fixture
+def mock_db() -> Mock:
+    """
+    Mock SQLAlchemy database session for service-layer tests.
+    
+    ``db.chain`` is the ``query().filter()`` result, so tests configure
+    ``chain.first``/``chain.all`` instead of the full return_value chain.
+    A fresh mock per test keeps anything configured on the chain from
+    leaking into later tests.
+    
+    Returns:
+        Mock database session
+    """
+    db = Mock()
+    db.chain = db.query.return_value.filter.return_value
+    return db
+
+
+@pytest.fixture(scope="session")
+def mock_user_id() -> uuid.UUID:
+    """Provide a mock user ID for service-layer tests."""
+    return uuid.uuid4()
+
+
+@pytest.fixture(scope="session")
+def mock_campaign_id() -> uuid.UUID:
+    """Provide a mock campaign ID for service-layer tests."""
+    return uuid.uuid4()
+
+
+@pytest.fixture(scope="session")
+def mock_email_id() -> uuid.UUID:
+    """Provide a mock email ID for service-layer tests."""
+    return uuid.uuid4()
+
+
 @pytest.fixture
 def mock_openai_response() -> Mock:
     """
@@ -440,6 +793,121 @@ def mock_openai_response() -> Mock:
     return mock_response
 
 
+@pytest.fixture(scope="session")
+def email_data() -> schemas.EmailSendRequest:
+    """
+    Build sample email send request data once per session.
+    
+    Tests must not mutate it; use ``email_data.model_copy(update=...)`` for
+    variations.
+    
+    Returns:
+        EmailSendRequest with every optional field populated
+    """
+    return schemas.EmailSendRequest(
+        recipient_email="test@example.com",
+        recipient_name="Test User",
+        subject="Test Subject",
+        body_text="This is a test email.",
+        body_html="<p>This is a test email.</p>",
+        recipient_company="Test Company",
+        recipient_job_title="Test Manager",
+        ab_test_variant="A"
+    )
+
+
+@pytest.fixture
+def mock_email_factory() -> Callable[..., Mock]:
+    """
+    Build fresh spec'd Email mocks, unsent by default.
+    
+    Every call constructs a new Mock, so child mocks and call records set up
+    in one test never leak into another.
+    
+    Returns:
+        Callable taking field overrides and returning a Mock spec'd to models.Email
+    """
+    def make(**fields: Any) -> Mock:
+        email = Mock(spec=models.Email)
+        email.configure_mock(
+            recipient_email="test@example.com",
+            recipient_name="Test User",
+            recipient_company="Test Company",
+            recipient_job_title="Test Manager",
+            subject="Test Subject",
+            body_text="This is a test email.",
+            body_html="<p>This is a test email.</p>",
+            is_sent=False,
+            is_opened=False,
+            is_replied=False,
+            is_converted=False,
+            is_follow_up=False,
+            follow_up_number=0,
+            original_email_id=None,
+            sent_at=None,
+            opened_at=None,
+            replied_at=None,
+            converted_at=None,
+            num_opens=0,
+            **fields,
+        )
+        return email
+    
+    return make
+
+
+@pytest.fixture(scope="session")
+def ids() -> SimpleNamespace:
+    """
+    Precompute reproducible UUID strings for the whole test session.
+    
+    The values come from a fixed-seed RNG, so runs are repeatable and tests
+    don't hit the OS entropy source for throwaway identifiers.
+    
+    Returns:
+        Namespace with nonexistent_campaign and tracking UUID strings
+    """
+    rng = random.Random(20240101)
+    
+    def next_uuid() -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    
+    return SimpleNamespace(
+        nonexistent_campaign=next_uuid(),
+        tracking=next_uuid(),
+    )
+
+
+@pytest.fixture(scope="session")
+def campaigns_module():
+    """
+    Resolve the campaigns endpoint module once for patch.object targets.
+    
+    Returns:
+        The app.api.api_v1.endpoints.campaigns module
+    """
+    from app.api.api_v1.endpoints import campaigns
+    return campaigns
+
+
+@pytest.fixture
+def patch_validate(mocker, campaigns_module):
+    """
+    Patch validate_campaign_access on the campaigns endpoint module.
+    
+    Args:
+        mocker: pytest-mock fixture
+        campaigns_module: The campaigns endpoint module
+        
+    Returns:
+        Callable forwarding keyword arguments (return_value, side_effect, ...)
+        to mocker.patch.object and returning the mock
+    """
+    def _patch(**kwargs):
+        return mocker.patch.object(campaigns_module, "validate_campaign_access", **kwargs)
+    return _patch
+
+
 @pytest.fixture(autouse=True)
 def patch_dependencies(monkeypatch):
     """
@@ -68,7 +68,8 @@ def run_integration_tests(args):
     """Run integration tests."""
     print("Running integration tests...")
     
-    cmd = ["pytest"]
+    # Clear pytest.ini's default "not integration" marker filter
+    cmd = ["pytest", "-m", ""]
     
     # Add verbosity if requested
     if args.verbose:
@@ -169,7 +170,7 @@ def main():
     else:
         # Default action: run all tests
         print("Running all tests...")
-        result = subprocess.run(["pytest", "-v" if args.verbose else ""])
+        result = subprocess.run(["pytest", "-m", "", "-v" if args.verbose else ""])
         return result.returncode
 
 
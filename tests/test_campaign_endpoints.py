@@ -75,25 +75,20 @@ class TestCampaignEndpoints:
         # Assert
         assert response.status_code == 201
         data = response.json()
-        assert data["name"] == campaign_data["name"]
-        assert data["description"] == campaign_data["description"]
-        assert data["target_audience"] == campaign_data["target_audience"]
-        assert data["is_active"] == campaign_data["is_active"]
+        assert {key: data[key] for key in campaign_data} == campaign_data
         assert "id" in data
         
         # Verify in database
-        campaign_in_db = db.query(models.EmailCampaign).filter(
-            models.EmailCampaign.id == data["id"]
-        ).first()
+        campaign_in_db = db.get(models.EmailCampaign, uuid.UUID(data["id"]))
         assert campaign_in_db is not None
         assert campaign_in_db.name == campaign_data["name"]
 
-    def test_get_campaigns(self, client: TestClient, test_campaign: models.EmailCampaign, token_headers: dict):
+    def test_get_campaigns(self, client: TestClient, readonly_test_campaign: models.EmailCampaign, token_headers: dict):
         """
         Test retrieving all campaigns.
         
         Arrange:
-            - Create a test campaign
+            - Use the shared read-only test campaign
             - Set up authentication headers
         
         Act:
@@ -115,15 +110,14 @@ class TestCampaignEndpoints:
         data = response.json()
         assert isinstance(data, list)
         # Check that our test campaign is in the list
-        campaign_ids = [campaign["id"] for campaign in data]
-        assert str(test_campaign.id) in campaign_ids
+        assert any(campaign["id"] == str(readonly_test_campaign.id) for campaign in data)
 
-    def test_get_campaign_by_id(self, client: TestClient, test_campaign: models.EmailCampaign, token_headers: dict):
+    def test_get_campaign_by_id(self, client: TestClient, readonly_test_campaign: models.EmailCampaign, token_headers: dict):
         """
         Test retrieving a specific campaign by ID.
         
         Arrange:
-            - Create a test campaign
+            - Use the shared read-only test campaign
             - Set up authentication headers
         
         Act:
@@ -135,17 +129,21 @@ class TestCampaignEndpoints:
         """
         # Act
         response = client.get(
-            f"/api/v1/campaigns/{test_campaign.id}",
+            f"/api/v1/campaigns/{readonly_test_campaign.id}",
             headers=token_headers
         )
         
         # Assert
         assert response.status_code == 200
         data = response.json()
-        assert data["id"] == str(test_campaign.id)
-        assert data["name"] == test_campaign.name
-        assert data["description"] == test_campaign.description
+        expected = {
+            "id": str(readonly_test_campaign.id),
+            "name": readonly_test_campaign.name,
+            "description": readonly_test_campaign.description
+        }
+        assert {key: data[key] for key in expected} == expected
 
+    @pytest.mark.no_db
     def test_get_campaign_not_found(self, client: TestClient, token_headers: dict):
         """
         Test retrieving a non-existent campaign.
@@ -202,11 +200,10 @@ class TestCampaignEndpoints:
         # Assert
         assert response.status_code == 200
         data = response.json()
-        assert data["id"] == str(test_campaign.id)
-        assert data["name"] == campaign_update_data["name"]
-        assert data["description"] == campaign_update_data["description"]
-        assert data["is_active"] == campaign_update_data["is_active"]
+        expected = {"id": str(test_campaign.id), **campaign_update_data}
+        assert {key: data[key] for key in expected} == expected
 
+    @pytest.mark.no_db
     def test_update_campaign_not_found(self, client: TestClient, token_headers: dict, campaign_update_data: dict):
         """
         Test updating a non-existent campaign.
@@ -267,11 +264,11 @@ class TestCampaignEndpoints:
         assert data["id"] == str(test_campaign.id)
         
         # Verify campaign was deleted from database
-        deleted_campaign = db.query(models.EmailCampaign).filter(
-            models.EmailCampaign.id == test_campaign.id
-        ).first()
+        db.expire_all()
+        deleted_campaign = db.get(models.EmailCampaign, test_campaign.id)
         assert deleted_campaign is None
 
+    @pytest.mark.no_db
     def test_delete_campaign_not_found(self, client: TestClient, token_headers: dict):
         """
         Test deleting a non-existent campaign.
@@ -348,7 +345,7 @@ class TestCampaignEndpoints:
         assert isinstance(data, list)
         
         # Check that only active campaigns are in the list
-        campaign_ids = [campaign["id"] for campaign in data]
+        campaign_ids = {campaign["id"] for campaign in data}
         assert str(test_campaign.id) in campaign_ids
         assert str(inactive_campaign.id) not in campaign_ids
         
@@ -361,7 +358,7 @@ class TestCampaignEndpoints:
         Test configuring A/B testing for a campaign.
         
         Arrange:
-            - Create a test campaign
+            - Use the shared read-only test campaign
             - Prepare A/B testing data
             - Set up authentication headers
         
@@ -384,19 +381,14 @@ class TestCampaignEndpoints:
         data = response.json()
         assert data["id"] == str(test_campaign.id)
         assert data["ab_testing"] is not None
-        assert data["ab_testing"]["enabled"] == ab_test_data["enabled"]
-        assert data["ab_testing"]["variant_a_name"] == ab_test_data["variant_a_name"]
-        assert data["ab_testing"]["variant_b_name"] == ab_test_data["variant_b_name"]
-        assert data["ab_testing"]["variant_a_percentage"] == ab_test_data["variant_a_percentage"]
-        assert data["ab_testing"]["variant_b_percentage"] == ab_test_data["variant_b_percentage"]
-        assert data["ab_testing"]["test_metric"] == ab_test_data["test_metric"]
+        assert {key: data["ab_testing"][key] for key in ab_test_data} == ab_test_data
 
-    def test_configure_ab_testing_invalid_data(self, client: TestClient, test_campaign: models.EmailCampaign, token_headers: dict):
+    def test_configure_ab_testing_invalid_data(self, client: TestClient, readonly_test_campaign: models.EmailCampaign, token_headers: dict):
         """
         Test configuring A/B testing with invalid data.
         
         Arrange:
-            - Create a test campaign
+            - Use the shared read-only test campaign
             - Prepare invalid A/B testing data (percentages don't add up to 100)
             - Set up authentication headers
         
@@ -419,7 +411,7 @@ class TestCampaignEndpoints:
         
         # Act
         response = client.post(
-            f"/api/v1/campaigns/{test_campaign.id}/ab-testing",
+            f"/api/v1/campaigns/{readonly_test_campaign.id}/ab-testing",
             json=invalid_ab_test_data,
             headers=token_headers
         )
@@ -21,10 +21,11 @@ from app.tests.utils.user import create_random_user
 from app.db.session import SessionLocal
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client():
-    """Create a FastAPI test client."""
-    return TestClient(app)
+    """Create a FastAPI test client shared by the module, with lifespan run once."""
+    with TestClient(app) as c:
+        yield c
 
 
 @pytest.fixture
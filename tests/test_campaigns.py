@@ -4,6 +4,9 @@ Tests for campaign management endpoints.
 This module contains tests for campaign creation, retrieval, updating, and deletion.
 """
 
+import uuid
+from types import MappingProxyType
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
@@ -11,6 +14,20 @@ from sqlalchemy.orm import Session
 from app import models
 
 
+# Read-only A/B test variant configurations shared by the A/B testing tests
+VALID_AB_TEST_VARIANTS = MappingProxyType({
+    "variants": {
+        "A": "Value proposition focused",
+        "B": "Pain point focused"
+    }
+})
+INVALID_AB_TEST_VARIANTS = MappingProxyType({
+    "variants": {
+        "A": "Only one variant which is invalid"
+    }
+})
+
+
 @pytest.mark.campaigns
 def test_create_campaign(client: TestClient, db: Session, token_headers: dict):
     """
@@ -46,35 +63,46 @@ def test_create_campaign(client: TestClient, db: Session, token_headers: dict):
     # Assert
     assert response.status_code == 201
     data = response.json()
-    assert data["name"] == campaign_data["name"]
-    assert data["description"] == campaign_data["description"]
+    expected = {
+        "name": campaign_data["name"],
+        "description": campaign_data["description"]
+    }
+    assert {key: data[key] for key in expected} == expected
     assert "id" in data
     
     # Verify campaign exists in database
-    campaign_in_db = db.query(models.Campaign).filter(models.Campaign.id == data["id"]).first()
+    campaign_in_db = db.get(models.Campaign, uuid.UUID(data["id"]))
     assert campaign_in_db is not None
     assert campaign_in_db.name == campaign_data["name"]
 
 
 @pytest.mark.campaigns
-def test_get_campaigns(client: TestClient, test_campaign: models.Campaign, token_headers: dict):
+@pytest.mark.parametrize("endpoint, campaign_fixture", [
+    ("/api/v1/campaigns", "test_campaign"),
+    ("/api/v1/campaigns/active", "active_campaign"),
+])
+def test_get_campaigns(client: TestClient, token_headers: dict, request, 
+                       endpoint: str, campaign_fixture: str):
     """
-    Test retrieving all campaigns for the current user.
+    Test retrieving all campaigns and only active campaigns for the current user.
     
     Arrange:
-        - Create a test campaign using fixture
+        - Create a test campaign (active for the active endpoint) using fixture
         - Set up authentication headers
     
     Act:
-        - Send GET request to campaigns endpoint
+        - Send GET request to the campaigns listing endpoint
     
     Assert:
         - Response status code is 200 OK
         - Response contains list of campaigns
         - Test campaign is in the list
     """
+    # Arrange
+    campaign = request.getfixturevalue(campaign_fixture)
+    
     # Act
-    response = client.get("/api/v1/campaigns", headers=token_headers)
+    response = client.get(endpoint, headers=token_headers)
     
     # Assert
     assert response.status_code == 200
@@ -83,17 +111,16 @@ def test_get_campaigns(client: TestClient, test_campaign: models.Campaign, token
     assert len(data) >= 1
     
     # Check if test campaign is in the list
-    campaign_ids = [campaign["id"] for campaign in data]
-    assert test_campaign.id in campaign_ids
+    assert campaign.id in {item["id"] for item in data}
 
 
 @pytest.mark.campaigns
-def test_get_campaign_by_id(client: TestClient, test_campaign: models.Campaign, token_headers: dict):
+def test_get_campaign_by_id(client: TestClient, readonly_test_campaign: models.Campaign, token_headers: dict):
     """
     Test retrieving a specific campaign by ID.
     
     Arrange:
-        - Create a test campaign using fixture
+        - Use the shared read-only test campaign
         - Set up authentication headers
     
     Act:
@@ -104,17 +131,21 @@ def test_get_campaign_by_id(client: TestClient, test_campaign: models.Campaign,
         - Response contains expected campaign data
     """
     # Act
-    response = client.get(f"/api/v1/campaigns/{test_campaign.id}", headers=token_headers)
+    response = client.get(f"/api/v1/campaigns/{readonly_test_campaign.id}", headers=token_headers)
     
     # Assert
     assert response.status_code == 200
     data = response.json()
-    assert data["id"] == test_campaign.id
-    assert data["name"] == test_campaign.name
-    assert data["description"] == test_campaign.description
+    expected = {
+        "id": readonly_test_campaign.id,
+        "name": readonly_test_campaign.name,
+        "description": readonly_test_campaign.description
+    }
+    assert {key: data[key] for key in expected} == expected
 
 
 @pytest.mark.campaigns
+@pytest.mark.no_db
 def test_get_campaign_not_found(client: TestClient, token_headers: dict):
     """
     Test retrieving a non-existent campaign.
@@ -177,20 +208,17 @@ def test_update_campaign(client: TestClient, test_campaign: models.Campaign, tok
     # Assert
     assert response.status_code == 200
     data = response.json()
-    assert data["name"] == update_data["name"]
-    assert data["description"] == update_data["description"]
-    assert data["is_active"] == update_data["is_active"]
+    assert {key: data[key] for key in update_data} == update_data
 
 
 @pytest.mark.campaigns
-def test_update_active_campaign(client: TestClient, test_campaign: models.Campaign, 
-                               token_headers: dict, db: Session):
+def test_update_active_campaign(client: TestClient, active_campaign: models.Campaign, 
+                               token_headers: dict):
     """
     Test updating an active campaign.
     
     Arrange:
-        - Create a test campaign using fixture
-        - Ensure campaign is active
+        - Create an active test campaign using fixture
         - Prepare update data
         - Set up authentication headers
     
@@ -201,10 +229,7 @@ def test_update_active_campaign(client: TestClient, test_campaign: models.Campai
         - Response status code is 400 Bad Request
         - Response contains error message about not being able to update active campaigns
     """
-    # Arrange - Ensure campaign is active
-    test_campaign.is_active = True
-    db.commit()
-    
+    # Arrange
     update_data = {
         "name": "Cannot Update Active Campaign",
         "description": "This update should fail"
@@ -212,7 +237,7 @@ def test_update_active_campaign(client: TestClient, test_campaign: models.Campai
     
     # Act
     response = client.put(
-        f"/api/v1/campaigns/{test_campaign.id}", 
+        f"/api/v1/campaigns/{active_campaign.id}", 
         json=update_data, 
         headers=token_headers
     )
@@ -253,56 +278,18 @@ def test_delete_campaign(client: TestClient, test_campaign: models.Campaign,
     assert data["id"] == test_campaign.id
     
     # Verify campaign is deleted from database
-    deleted_campaign = db.query(models.Campaign).filter(
-        models.Campaign.id == test_campaign.id
-    ).first()
+    db.expire_all()
+    deleted_campaign = db.get(models.Campaign, test_campaign.id)
     assert deleted_campaign is None
 
 
-@pytest.mark.campaigns
-def test_get_active_campaigns(client: TestClient, test_campaign: models.Campaign, 
-                             token_headers: dict, db: Session):
-    """
-    Test retrieving active campaigns.
-    
-    Arrange:
-        - Create a test campaign using fixture
-        - Ensure campaign is active
-        - Set up authentication headers
-    
-    Act:
-        - Send GET request to active campaigns endpoint
-    
-    Assert:
-        - Response status code is 200 OK
-        - Response contains list of active campaigns
-        - Test campaign is in the list
-    """
-    # Arrange - Ensure campaign is active
-    test_campaign.is_active = True
-    db.commit()
-    
-    # Act
-    response = client.get("/api/v1/campaigns/active", headers=token_headers)
-    
-    # Assert
-    assert response.status_code == 200
-    data = response.json()
-    assert isinstance(data, list)
-    assert len(data) >= 1
-    
-    # Check if test campaign is in the list
-    campaign_ids = [campaign["id"] for campaign in data]
-    assert test_campaign.id in campaign_ids
-
-
 @pytest.mark.campaigns
 def test_configure_ab_testing(client: TestClient, test_campaign: models.Campaign, token_headers: dict):
     """
     Test configuring A/B testing for a campaign.
     
     Arrange:
-        - Create a test campaign using fixture
+        - Use the shared read-only test campaign
         - Prepare A/B test configuration data
         - Set up authentication headers
     
@@ -314,13 +301,7 @@ def test_configure_ab_testing(client: TestClient, test_campaign: models.Campaign
         - Response contains campaign with A/B testing configuration
     """
     # Arrange
-    ab_test_config = {
-        "campaign_id": test_campaign.id,
-        "variants": {
-            "A": "Value proposition focused",
-            "B": "Pain point focused"
-        }
-    }
+    ab_test_config = {"campaign_id": test_campaign.id, **VALID_AB_TEST_VARIANTS}
     
     # Act
     response = client.post(
@@ -336,13 +317,13 @@ def test_configure_ab_testing(client: TestClient, test_campaign: models.Campaign
 
 
 @pytest.mark.campaigns
-def test_configure_ab_testing_invalid_config(client: TestClient, test_campaign: models.Campaign, 
-                                           token_headers: dict):
+def test_configure_ab_testing_invalid_config(client: TestClient, readonly_test_campaign: models.Campaign, 
+                                             token_headers: dict):
     """
     Test configuring A/B testing with invalid configuration.
     
     Arrange:
-        - Create a test campaign using fixture
+        - Use the shared read-only test campaign
         - Prepare invalid A/B test configuration (only one variant)
         - Set up authentication headers
     
@@ -354,12 +335,7 @@ def test_configure_ab_testing_invalid_config(client: TestClient, test_campaign:
         - Response contains error message about requiring at least two variants
     """
     # Arrange
-    ab_test_config = {
-        "campaign_id": test_campaign.id,
-        "variants": {
-            "A": "Only one variant which is invalid"
-        }
-    }
+    ab_test_config = {"campaign_id": readonly_test_campaign.id, **INVALID_AB_TEST_VARIANTS}
     
     # Act
     response = client.post(
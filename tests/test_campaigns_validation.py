@@ -1,9 +1,60 @@
 import json
+import uuid
 import pytest
-from fastapi import status
-from unittest.mock import Mock, patch, MagicMock
+from datetime import datetime
+from fastapi import HTTPException, status
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 
-from app.models.campaign import EmailCampaign
+
+_NOT_FOUND, _FORBIDDEN, _BAD_REQUEST = (
+    status.HTTP_404_NOT_FOUND,
+    status.HTTP_403_FORBIDDEN,
+    status.HTTP_400_BAD_REQUEST,
+)
+
+
+# The handlers run schemas.Campaign.model_validate on whatever the service
+# returns, so the stub carries every field that schema requires
+_CAMPAIGN_ID = uuid.uuid4()
+_CREATED_AT = datetime(2024, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def campaign_factory(mock_current_user):
+    """
+    Build a mock campaign owned by the current user.
+    
+    Returns:
+        Callable taking field overrides and returning the mock campaign
+    """
+    def make(campaign_id=_CAMPAIGN_ID, **overrides):
+        fields = {
+            "name": "Test Campaign",
+            "is_active": True,
+            "description": "Test description",
+            "industry": "Technology",
+            "target_job_title": "CTO",
+            "pain_points": "Manual outreach",
+            "follow_up_days": 3,
+            "max_follow_ups": 2,
+            "ab_test_active": False,
+            "total_emails": 0,
+            "opened_emails": 0,
+            "replied_emails": 0,
+            "converted_emails": 0,
+            **overrides
+        }
+        
+        return SimpleNamespace(
+            id=campaign_id,
+            user_id=mock_current_user.id,
+            created_at=_CREATED_AT,
+            updated_at=None,
+            **fields
+        )
+    
+    return make
 
 
 # Test API endpoint that uses validate_campaign_access
@@ -11,37 +62,14 @@ from app.models.campaign import EmailCampaign
 @pytest.mark.campaigns
 @pytest.mark.validation
 @pytest.mark.integration
-def test_read_campaign_success(client, mocker, mock_current_user):
+def test_read_campaign_success(client, mocker, campaign_factory, patch_validate):
     """Test successful access to a campaign belonging to the user."""
     # Arrange
-    campaign_id = 123
-    mock_campaign = MagicMock(spec=EmailCampaign)
-    mock_campaign.id = campaign_id
-    mock_campaign.user_id = mock_current_user.id
-    mock_campaign.name = "Test Campaign"
-    mock_campaign.is_active = True
-    mock_campaign.industry = "Technology"
-    
-    # Convert campaign to dict for response
-    campaign_dict = {
-        "id": str(campaign_id),
-        "user_id": str(mock_current_user.id),
-        "name": "Test Campaign",
-        "is_active": True,
-        "industry": "Technology",
-        "description": "Test description",
-        "total_emails": 0,
-        "opened_emails": 0,
-        "replied_emails": 0,
-        "converted_emails": 0
-    }
+    campaign_id = _CAMPAIGN_ID
+    mock_campaign = campaign_factory(campaign_id)
     
     # Mock the validate_campaign_access function
-    mocker.patch('app.api.api_v1.endpoints.campaigns.validate_campaign_access',
-                return_value=mock_campaign)
-    
-    # Mock campaign schema to dict conversion
-    mocker.patch.object(mock_campaign, '__dict__', return_value=campaign_dict)
+    patch_validate(return_value=mock_campaign)
     
     # Act
     response = client.get(f"/api/v1/campaigns/{campaign_id}")
@@ -56,18 +84,16 @@ def test_read_campaign_success(client, mocker, mock_current_user):
 @pytest.mark.campaigns
 @pytest.mark.validation
 @pytest.mark.integration
-def test_read_campaign_not_found(client, mocker, mock_current_user):
+def test_read_campaign_not_found(client, patch_validate):
     """Test 404 response when campaign doesn't exist."""
     # Arrange
-    campaign_id = 123
+    campaign_id = _CAMPAIGN_ID
     
     # Mock the validate_campaign_access function to raise 404
-    from fastapi import HTTPException
-    mocker.patch('app.api.api_v1.endpoints.campaigns.validate_campaign_access',
-                side_effect=HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Campaign not found"
-                ))
+    patch_validate(side_effect=HTTPException(
+        status_code=_NOT_FOUND,
+        detail="Campaign not found"
+    ))
     
     # Act
     response = client.get(f"/api/v1/campaigns/{campaign_id}")
@@ -81,18 +107,16 @@ def test_read_campaign_not_found(client, mocker, mock_current_user):
 @pytest.mark.campaigns
 @pytest.mark.validation
 @pytest.mark.integration
-def test_read_campaign_forbidden(client, mocker, mock_current_user):
+def test_read_campaign_forbidden(client, patch_validate):
     """Test 403 response when user doesn't have permission to access the campaign."""
     # Arrange
-    campaign_id = 123
+    campaign_id = _CAMPAIGN_ID
     
     # Mock the validate_campaign_access function to raise 403
-    from fastapi import HTTPException
-    mocker.patch('app.api.api_v1.endpoints.campaigns.validate_campaign_access',
-                side_effect=HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Not enough permissions"
-                ))
+    patch_validate(side_effect=HTTPException(
+        status_code=_FORBIDDEN,
+        detail="Not enough permissions"
+    ))
     
     # Act
     response = client.get(f"/api/v1/campaigns/{campaign_id}")
@@ -106,47 +130,26 @@ def test_read_campaign_forbidden(client, mocker, mock_current_user):
 @pytest.mark.campaigns
 @pytest.mark.validation
 @pytest.mark.integration
-def test_update_campaign_success(client, mocker, mock_current_user):
+def test_update_campaign_success(client, mocker, campaign_factory, patch_validate, campaigns_module):
     """Test successful update of a campaign belonging to the user."""
     # Arrange
-    campaign_id = 123
-    mock_campaign = MagicMock(spec=EmailCampaign)
-    mock_campaign.id = campaign_id
-    mock_campaign.user_id = mock_current_user.id
-    mock_campaign.name = "Old Name"
-    mock_campaign.is_active = False
+    campaign_id = _CAMPAIGN_ID
+    mock_campaign = campaign_factory(campaign_id, name="Old Name", is_active=False)
     
     # Updated campaign
-    updated_campaign = MagicMock(spec=EmailCampaign)
-    updated_campaign.id = campaign_id
-    updated_campaign.user_id = mock_current_user.id
-    updated_campaign.name = "New Name"
-    updated_campaign.is_active = False
-    
-    # Convert campaign to dict for response
-    campaign_dict = {
-        "id": str(campaign_id),
-        "user_id": str(mock_current_user.id),
-        "name": "New Name",
-        "is_active": False,
-        "description": "Updated description",
-        "industry": "Technology",
-        "total_emails": 0,
-        "opened_emails": 0,
-        "replied_emails": 0,
-        "converted_emails": 0
-    }
+    updated_campaign = campaign_factory(
+        campaign_id,
+        name="New Name",
+        is_active=False,
+        description="Updated description"
+    )
     
     # Mock the validate_campaign_access function
-    mocker.patch('app.api.api_v1.endpoints.campaigns.validate_campaign_access',
-                return_value=mock_campaign)
+    patch_validate(return_value=mock_campaign)
     
     # Mock the update_user_campaign function
-    mocker.patch('app.api.api_v1.endpoints.campaigns.update_user_campaign',
-                return_value=updated_campaign)
-    
-    # Mock campaign schema to dict conversion
-    mocker.patch.object(updated_campaign, '__dict__', return_value=campaign_dict)
+    mocker.patch.object(campaigns_module, 'update_user_campaign',
+                        return_value=updated_campaign)
     
     # Update data
     update_data = {
@@ -168,18 +171,16 @@ def test_update_campaign_success(client, mocker, mock_current_user):
 @pytest.mark.campaigns
 @pytest.mark.validation
 @pytest.mark.integration
-def test_update_active_campaign_fails(client, mocker, mock_current_user):
+def test_update_active_campaign_fails(client, patch_validate):
     """Test that updating an active campaign fails with 400 error."""
     # Arrange
-    campaign_id = 123
+    campaign_id = _CAMPAIGN_ID
     
     # Mock the validate_campaign_access function to raise 400
-    from fastapi import HTTPException
-    mocker.patch('app.api.api_v1.endpoints.campaigns.validate_campaign_access',
-                side_effect=HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Cannot update active campaign. Please deactivate it first."
-                ))
+    patch_validate(side_effect=HTTPException(
+        status_code=_BAD_REQUEST,
+        detail="Cannot update active campaign. Please deactivate it first."
+    ))
     
     # Update data
     update_data = {
@@ -199,39 +200,18 @@ def test_update_active_campaign_fails(client, mocker, mock_current_user):
 @pytest.mark.campaigns
 @pytest.mark.validation
 @pytest.mark.integration
-def test_delete_campaign_success(client, mocker, mock_current_user):
+def test_delete_campaign_success(client, mocker, campaign_factory, patch_validate, campaigns_module):
     """Test successful deletion of a campaign belonging to the user."""
     # Arrange
-    campaign_id = 123
-    mock_campaign = MagicMock(spec=EmailCampaign)
-    mock_campaign.id = campaign_id
-    mock_campaign.user_id = mock_current_user.id
-    mock_campaign.name = "Test Campaign"
-    
-    # Convert campaign to dict for response
-    campaign_dict = {
-        "id": str(campaign_id),
-        "user_id": str(mock_current_user.id),
-        "name": "Test Campaign",
-        "is_active": True,
-        "description": "Test description",
-        "industry": "Technology",
-        "total_emails": 0,
-        "opened_emails": 0,
-        "replied_emails": 0,
-        "converted_emails": 0
-    }
+    campaign_id = _CAMPAIGN_ID
+    mock_campaign = campaign_factory(campaign_id)
     
     # Mock the validate_campaign_access function
-    mocker.patch('app.api.api_v1.endpoints.campaigns.validate_campaign_access',
-                return_value=mock_campaign)
+    patch_validate(return_value=mock_campaign)
     
     # Mock the delete_user_campaign function
-    mocker.patch('app.api.api_v1.endpoints.campaigns.delete_user_campaign',
-                return_value=mock_campaign)
-    
-    # Mock campaign schema to dict conversion
-    mocker.patch.object(mock_campaign, '__dict__', return_value=campaign_dict)
+    mocker.patch.object(campaigns_module, 'delete_user_campaign',
+                        return_value=mock_campaign)
     
     # Act
     response = client.delete(f"/api/v1/campaigns/{campaign_id}")
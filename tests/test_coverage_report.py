@@ -7,14 +7,21 @@ and provides a detailed report on coverage gaps.
 
 import os
 import sys
+import ast
 import json
+import concurrent.futures
 import importlib
 import inspect
-import re
 import subprocess
-from typing import Dict, List, Set, Tuple, Any, Optional
+import argparse
+from typing import Dict, Iterator, List, Set, Tuple, Any, Optional
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib parser
+    orjson = None
+
 # Constants
 APP_DIR = "app"
 COVERAGE_DIR = ".coverage"
@@ -22,8 +29,13 @@ COVERAGE_FILE = "coverage.json"
 REPORT_FILE = "coverage_gaps.md"
 
 
-def run_coverage_json() -> None:
-    """Run pytest with coverage and output JSON coverage data."""
+def run_coverage_json(markers: Optional[str] = None) -> None:
+    """
+    Run pytest with coverage and output JSON coverage data.
+    
+    Args:
+        markers: Optional marker expression passed to pytest's -m option
+    """
     # Ensure we're in the project root
     if not os.path.exists(APP_DIR):
         print(f"Error: This script must be run from the project root containing '{APP_DIR}'")
@@ -35,8 +47,14 @@ def run_coverage_json() -> None:
         "pytest",
         "--cov=" + APP_DIR,
         "--cov-report=json",
-        "tests/"
+        "-p", "no:cacheprovider",
+        "-p", "no:warnings",
+        "--no-header",
+        "-q",
     ]
+    if markers:
+        cmd += ["-m", markers]
+    cmd.append("tests/")
     result = subprocess.run(cmd, check=False, capture_output=True)
     
     if result.returncode != 0:
@@ -51,6 +69,10 @@ def run_coverage_json() -> None:
 def load_coverage_data() -> Dict[str, Any]:
     """Load JSON coverage data from the coverage file."""
     try:
+        if orjson is not None:
+            # orjson parses bytes directly and is much faster on large reports
+            with open(COVERAGE_FILE, 'rb') as f:
+                return orjson.loads(f.read())
         with open(COVERAGE_FILE, 'r') as f:
             return json.load(f)
     except Exception as e:
@@ -58,12 +80,12 @@ def load_coverage_data() -> Dict[str, Any]:
         sys.exit(1)
 
 
-def extract_covered_functions(coverage_data: Dict[str, Any]) -> Dict[str, List[str]]:
+def extract_covered_functions(coverage_data: Dict[str, Any]) -> Dict[str, Set[str]]:
     """
     Extract covered functions from coverage data.
     
     Returns:
-        Dictionary mapping module paths to lists of covered function names
+        Dictionary mapping module paths to sets of covered function names
     """
     covered_functions = {}
     
@@ -76,113 +98,96 @@ def extract_covered_functions(coverage_data: Dict[str, Any]) -> Dict[str, List[s
         if module_path.endswith('.py'):
             module_path = module_path[:-3]
         
-        # Find covered line numbers
-        covered_lines = set()
-        for line_num, execution_count in enumerate(file_data['executed_lines']):
-            if execution_count > 0:
-                covered_lines.add(file_data['executed_lines'][line_num])
+        # executed_lines already lists the covered line numbers
+        covered_lines = set(file_data.get('executed_lines', ()))
         
-        # Read the file to extract function definitions
-        module_functions = extract_functions_from_file(file_path, covered_lines)
+        # A function is covered if its first line is covered
+        module_functions = {
+            name for name, lineno in scan_file(file_path)
+            if lineno in covered_lines
+        }
         covered_functions[file_path] = module_functions
     
     return covered_functions
 
 
-def extract_functions_from_file(file_path: str, covered_lines: Set[int]) -> List[str]:
+def scan_file(file_path: str) -> List[Tuple[str, int]]:
     """
-    Extract functions and their coverage status from a Python file.
+    Extract function definitions from a Python file with a single AST walk.
     
     Args:
         file_path: Path to the Python file
-        covered_lines: Set of line numbers that were covered by tests
     
     Returns:
-        List of covered function names
+        List of (function name, line number) tuples
     """
-    covered_functions = []
-    
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            source = f.readlines()
-        
-        # Find function definitions
-        function_pattern = re.compile(r'^\s*def\s+([a-zA-Z0-9_]+)\s*\(')
-        for i, line in enumerate(source):
-            match = function_pattern.match(line)
-            if match:
-                function_name = match.group(1)
-                if i + 1 in covered_lines:  # Function is covered if first line is covered
-                    covered_functions.append(function_name)
-    
+        with open(file_path, 'rb') as f:
+            tree = ast.parse(f.read(), filename=file_path)
     except Exception as e:
         print(f"Error processing file {file_path}: {str(e)}")
+        return []
     
-    return covered_functions
+    return [
+        (node.name, node.lineno)
+        for node in ast.walk(tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    ]
 
 
-def get_all_functions(directory: str = APP_DIR) -> Dict[str, List[str]]:
+def iter_python_files(directory: str) -> Iterator[str]:
     """
-    Get all functions defined in the app directory.
+    Recursively yield the paths of Python files under a directory.
     
-    Returns:
-        Dictionary mapping module paths to lists of all function names
-    """
-    all_functions = {}
-    
-    # Walk through all Python files in the app directory
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.py'):
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path)
-                
-                # Extract functions using AST
-                function_names = extract_all_functions_from_file(file_path)
-                if function_names:
-                    all_functions[rel_path] = function_names
+    Uses os.scandir so directory entries are classified from the cached
+    readdir type instead of a separate stat() per entry.
     
-    return all_functions
+    Args:
+        directory: Root directory to scan
+    
+    Yields:
+        Paths of .py files
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_python_files(entry.path)
+            elif entry.name.endswith('.py'):
+                yield entry.path
 
 
-def extract_all_functions_from_file(file_path: str) -> List[str]:
+def get_all_functions(directory: str = APP_DIR) -> Dict[str, List[str]]:
     """
-    Extract all function names from a Python file using regex.
-    
-    Args:
-        file_path: Path to the Python file
+    Get all functions defined in the app directory.
     
     Returns:
-        List of all function names
+        Dictionary mapping module paths to lists of all function names
     """
-    functions = []
-    
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            source = f.read()
-        
-        # Find function definitions, excluding ones in classes or nested functions
-        pattern = r'(?:^|\n)\s*def\s+([a-zA-Z0-9_]+)\s*\('
-        matches = re.finditer(pattern, source)
-        for match in matches:
-            functions.append(match.group(1))
-        
-    except Exception as e:
-        print(f"Error reading {file_path}: {str(e)}")
+    # Collect all Python files in the app directory
+    file_paths = list(iter_python_files(directory))
+    
+    # Parsing is independent per file, so spread it across processes
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        results = executor.map(scan_file, file_paths, chunksize=16)
+        all_functions = {
+            os.path.relpath(file_path): [name for name, _ in functions]
+            for file_path, functions in zip(file_paths, results)
+            if functions
+        }
     
-    return functions
+    return all_functions
 
 
 def calculate_coverage_gap(
     all_functions: Dict[str, List[str]], 
-    covered_functions: Dict[str, List[str]]
+    covered_functions: Dict[str, Set[str]]
 ) -> Dict[str, List[str]]:
     """
     Calculate which functions are not covered by tests.
     
     Args:
         all_functions: Dictionary mapping file paths to all function names
-        covered_functions: Dictionary mapping file paths to covered function names
+        covered_functions: Dictionary mapping file paths to sets of covered function names
     
     Returns:
         Dictionary mapping file paths to uncovered function names
@@ -190,7 +195,7 @@ def calculate_coverage_gap(
     uncovered_functions = {}
     
     for file_path, functions in all_functions.items():
-        file_covered_functions = covered_functions.get(file_path, [])
+        file_covered_functions = covered_functions.get(file_path, set())
         uncovered = [f for f in functions if f not in file_covered_functions]
         
         if uncovered:
@@ -221,79 +226,81 @@ def generate_report(
     file_coverage_pct = (total_files - uncovered_files) / total_files * 100 if total_files > 0 else 0
     function_coverage_pct = (total_functions - uncovered_function_count) / total_functions * 100 if total_functions > 0 else 0
     
-    # Generate the report
-    with open(output_file, 'w') as report:
-        report.write("# ReplyRocket.io Test Coverage Report\n\n")
-        
-        # Summary
-        report.write("## Coverage Summary\n\n")
-        report.write(f"- **Files**: {total_files - uncovered_files}/{total_files} ({file_coverage_pct:.1f}% covered)\n")
-        report.write(f"- **Functions**: {total_functions - uncovered_function_count}/{total_functions} ({function_coverage_pct:.1f}% covered)\n\n")
-        
-        # Uncovered functions by module
-        report.write("## Uncovered Functions by Module\n\n")
-        
-        if not uncovered_functions:
-            report.write("All functions are covered by tests! 🎉\n\n")
-        else:
-            # Sort modules by coverage percentage (ascending)
-            sorted_modules = sorted(
-                uncovered_functions.items(),
-                key=lambda x: len(x[1]) / len(all_functions[x[0]]) if x[0] in all_functions else 0,
-                reverse=True
-            )
-            
-            for file_path, functions in sorted_modules:
-                all_count = len(all_functions[file_path]) if file_path in all_functions else 0
-                covered_count = all_count - len(functions)
-                coverage_pct = covered_count / all_count * 100 if all_count > 0 else 0
-                
-                report.write(f"### {file_path} ({coverage_pct:.1f}% covered)\n\n")
-                report.write("The following functions need test coverage:\n\n")
-                for function in sorted(functions):
-                    report.write(f"- `{function}()`\n")
-                report.write("\n")
+    # Per-module (all_count, covered_count, coverage_pct), computed once
+    module_stats = {}
+    for file_path, functions in uncovered_functions.items():
+        all_count = len(all_functions.get(file_path, ()))
+        covered_count = all_count - len(functions)
+        module_stats[file_path] = (
+            all_count,
+            covered_count,
+            covered_count / all_count * 100 if all_count > 0 else 0,
+        )
+    
+    # Sort modules by coverage percentage (ascending) once for both sections
+    sorted_modules = sorted(uncovered_functions.items(), key=lambda x: module_stats[x[0]][2])
+    
+    # Build the report in memory and write it out once
+    parts: List[str] = []
+    parts.append("# ReplyRocket.io Test Coverage Report\n\n")
+    
+    # Summary
+    parts.append("## Coverage Summary\n\n")
+    parts.append(f"- **Files**: {total_files - uncovered_files}/{total_files} ({file_coverage_pct:.1f}% covered)\n")
+    parts.append(f"- **Functions**: {total_functions - uncovered_function_count}/{total_functions} ({function_coverage_pct:.1f}% covered)\n\n")
+    
+    # Uncovered functions by module
+    parts.append("## Uncovered Functions by Module\n\n")
+    
+    if not uncovered_functions:
+        parts.append("All functions are covered by tests! 🎉\n\n")
+    else:
+        for file_path, functions in sorted_modules:
+            parts.append(f"### {file_path} ({module_stats[file_path][2]:.1f}% covered)\n\n")
+            parts.append("The following functions need test coverage:\n\n")
+            for function in sorted(functions):
+                parts.append(f"- `{function}()`\n")
+            parts.append("\n")
+    
+    # Recommendations
+    parts.append("## Recommendations\n\n")
+    parts.append("To improve test coverage, focus on the following areas:\n\n")
+    
+    if uncovered_functions:
+        # Top 5 modules with lowest coverage
+        priority_modules = sorted_modules[:5]
         
-        # Recommendations
-        report.write("## Recommendations\n\n")
-        report.write("To improve test coverage, focus on the following areas:\n\n")
-        
-        if uncovered_functions:
-            # Find modules with lowest coverage
-            priority_modules = sorted(
-                uncovered_functions.items(),
-                key=lambda x: len(x[1]) / len(all_functions[x[0]]) if x[0] in all_functions else 0,
-                reverse=True
-            )[:5]  # Top 5 modules with lowest coverage
-            
-            for file_path, functions in priority_modules:
-                all_count = len(all_functions[file_path]) if file_path in all_functions else 0
-                covered_count = all_count - len(functions)
-                coverage_pct = covered_count / all_count * 100 if all_count > 0 else 0
-                
-                report.write(f"1. **{file_path}** ({coverage_pct:.1f}% covered): Focus on testing critical functions like ")
-                report.write(", ".join([f"`{f}()`" for f in functions[:3]]))
-                if len(functions) > 3:
-                    report.write(f" and {len(functions) - 3} others")
-                report.write(".\n")
-        else:
-            report.write("- Maintain current coverage as new features are developed\n")
-            report.write("- Consider adding more edge case tests\n")
-        
-        # Report generation timestamp
-        from datetime import datetime
-        report.write(f"\n\n*Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n")
+        for file_path, functions in priority_modules:
+            parts.append(f"1. **{file_path}** ({module_stats[file_path][2]:.1f}% covered): Focus on testing critical functions like ")
+            parts.append(", ".join([f"`{f}()`" for f in functions[:3]]))
+            if len(functions) > 3:
+                parts.append(f" and {len(functions) - 3} others")
+            parts.append(".\n")
+    else:
+        parts.append("- Maintain current coverage as new features are developed\n")
+        parts.append("- Consider adding more edge case tests\n")
+    
+    # Report generation timestamp
+    from datetime import datetime
+    parts.append(f"\n\n*Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n")
+    
+    with open(output_file, 'w') as report:
+        report.write("".join(parts))
     
     print(f"Coverage report generated: {output_file}")
 
 
 def main() -> None:
     """Main entry point for the coverage gap analyzer."""
+    parser = argparse.ArgumentParser(description="Test coverage gap analyzer")
+    parser.add_argument("--markers", help='Marker expression to select tests, e.g. "not slow"')
+    args = parser.parse_args()
+    
     print("ReplyRocket.io Test Coverage Analyzer")
     print("====================================")
     
     # Run tests with coverage
-    run_coverage_json()
+    run_coverage_json(args.markers)
     
     # Load coverage data
     coverage_data = load_coverage_data()
@@ -10,10 +10,11 @@ import time
 import asyncio
 import threading
 import concurrent.futures
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import statistics
 import argparse
 
+import httpx
 from sqlalchemy.orm import Session
 from fastapi.testclient import TestClient
 
@@ -24,123 +25,131 @@ from app.models.campaign import EmailCampaign
 from app.models.user import User
 
 
-def run_simple_query(session: Session) -> Dict:
-    """Run a simple database query."""
-    start_time = time.time()
-    result = session.query(User).limit(10).all()
-    end_time = time.time()
+def calculate_stats(durations: List[float]) -> Dict:
+    """
+    Calculate summary statistics for a list of durations.
     
+    The mean is computed once with fmean and reused as xbar for the
+    standard deviation, so the samples are only summed once.
+    """
+    avg = statistics.fmean(durations)
     return {
-        "count": len(result),
-        "duration": end_time - start_time
+        "min": min(durations),
+        "max": max(durations),
+        "avg": avg,
+        "median": statistics.median(durations),
+        "std_dev": statistics.stdev(durations, xbar=avg),
+        "total": sum(durations)
     }
 
 
+def run_simple_query(session: Session) -> float:
+    """Run a simple database query and return its duration in seconds."""
+    start_ns = time.perf_counter_ns()
+    session.query(User).limit(10).all()
+    return (time.perf_counter_ns() - start_ns) * 1e-9
+
+
+def warm_up(name: str = "warmup") -> None:
+    """Run one untimed query so pool and dialect setup stay out of the stats."""
+    with SessionManager(name) as db:
+        run_simple_query(db)
+
+
 def test_session_direct_usage() -> Dict:
     """Test database performance with direct session usage."""
-    results = []
+    warm_up()
+    durations = [0.0] * 50
     
-    for _ in range(50):
+    for i in range(50):
         db = SessionLocal()
         try:
-            results.append(run_simple_query(db))
+            durations[i] = run_simple_query(db)
         finally:
             db.close()
     
     # Calculate statistics
-    durations = [r["duration"] for r in results]
-    return {
-        "min": min(durations),
-        "max": max(durations),
-        "avg": statistics.mean(durations),
-        "median": statistics.median(durations),
-        "std_dev": statistics.stdev(durations),
-        "total": sum(durations)
-    }
+    return calculate_stats(durations)
 
 
 def test_session_context_manager() -> Dict:
     """Test database performance with context manager session usage."""
-    results = []
+    warm_up()
+    durations = [0.0] * 50
     
-    for _ in range(50):
+    for i in range(50):
         with SessionManager("test_performance") as db:
-            results.append(run_simple_query(db))
+            durations[i] = run_simple_query(db)
     
     # Calculate statistics
-    durations = [r["duration"] for r in results]
-    return {
-        "min": min(durations),
-        "max": max(durations),
-        "avg": statistics.mean(durations),
-        "median": statistics.median(durations),
-        "std_dev": statistics.stdev(durations),
-        "total": sum(durations)
-    }
+    return calculate_stats(durations)
+
+
+def test_session_reused() -> Dict:
+    """Test database performance with one session reused across queries."""
+    warm_up()
+    durations = [0.0] * 50
+    
+    with SessionManager("reused") as db:
+        for i in range(50):
+            durations[i] = run_simple_query(db)
+    
+    # Calculate statistics
+    return calculate_stats(durations)
 
 
 def test_concurrent_sessions(num_threads: int = 10, queries_per_thread: int = 10) -> Dict:
     """Test database performance with concurrent sessions."""
-    results = []
-    lock = threading.Lock()
-    
-    def worker():
-        thread_results = []
-        for _ in range(queries_per_thread):
+    def worker(num_queries: int) -> List[float]:
+        warm_up(f"warmup_{threading.get_ident()}")
+        thread_results = [0.0] * num_queries
+        for i in range(num_queries):
             with SessionManager(f"thread_{threading.get_ident()}") as db:
-                thread_results.append(run_simple_query(db))
-        
-        with lock:
-            results.extend(thread_results)
+                thread_results[i] = run_simple_query(db)
+        return thread_results
     
-    threads = []
-    for _ in range(num_threads):
-        thread = threading.Thread(target=worker)
-        threads.append(thread)
-        thread.start()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+        futures = [executor.submit(worker, queries_per_thread) for _ in range(num_threads)]
+        all_buffers = [future.result() for future in futures]
     
-    for thread in threads:
-        thread.join()
+    durations = [duration for buffer in all_buffers for duration in buffer]
     
     # Calculate statistics
-    durations = [r["duration"] for r in results]
     return {
-        "min": min(durations),
-        "max": max(durations),
-        "avg": statistics.mean(durations),
-        "median": statistics.median(durations),
-        "std_dev": statistics.stdev(durations),
-        "total": sum(durations),
+        **calculate_stats(durations),
         "thread_count": num_threads,
         "queries_per_thread": queries_per_thread,
-        "total_queries": len(results)
+        "total_queries": len(durations)
     }
 
 
-def test_api_endpoint_performance(client: TestClient, endpoint: str, iterations: int = 50) -> Dict:
-    """Test performance of an API endpoint that uses database sessions."""
-    results = []
+async def _run_api_requests(endpoint: str, iterations: int, concurrency: int) -> Tuple[List[float], List[int]]:
+    """Issue concurrent requests against the app on one event loop."""
+    durations = [0.0] * iterations
+    semaphore = asyncio.Semaphore(concurrency)
     
-    for _ in range(iterations):
-        start_time = time.time()
-        response = client.get(endpoint)
-        end_time = time.time()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def timed_get(i: int) -> int:
+            async with semaphore:
+                start_ns = time.perf_counter_ns()
+                response = await client.get(endpoint)
+                durations[i] = (time.perf_counter_ns() - start_ns) * 1e-9
+                return response.status_code
         
-        results.append({
-            "status_code": response.status_code,
-            "duration": end_time - start_time
-        })
+        status_codes = await asyncio.gather(*(timed_get(i) for i in range(iterations)))
+    
+    return durations, status_codes
+
+
+def test_api_endpoint_performance(endpoint: str, iterations: int = 50, concurrency: int = 10) -> Dict:
+    """Test performance of an API endpoint that uses database sessions."""
+    durations, status_codes = asyncio.run(_run_api_requests(endpoint, iterations, concurrency))
     
     # Calculate statistics
-    durations = [r["duration"] for r in results]
     return {
-        "min": min(durations),
-        "max": max(durations),
-        "avg": statistics.mean(durations),
-        "median": statistics.median(durations),
-        "std_dev": statistics.stdev(durations),
-        "total": sum(durations),
-        "success_rate": sum(1 for r in results if r["status_code"] == 200) / len(results)
+        **calculate_stats(durations),
+        "concurrency": concurrency,
+        "success_rate": status_codes.count(200) / iterations
     }
 
 
@@ -182,6 +191,7 @@ def main():
     parser.add_argument("--api", action="store_true", help="Run API endpoint tests")
     parser.add_argument("--threads", type=int, default=10, help="Number of threads for concurrent tests")
     parser.add_argument("--queries", type=int, default=10, help="Queries per thread")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent requests for API tests")
     args = parser.parse_args()
     
     print("\n=== DATABASE SESSION PERFORMANCE TESTS ===\n")
@@ -194,11 +204,15 @@ def main():
     context_stats = test_session_context_manager()
     print_stats("Context Manager Session Usage", context_stats)
     
-    # 3. Test concurrent sessions
+    # 3. Test a single session reused across queries
+    reused_stats = test_session_reused()
+    print_stats("Reused Session Usage", reused_stats)
+    
+    # 4. Test concurrent sessions
     concurrent_stats = test_concurrent_sessions(args.threads, args.queries)
     print_stats("Concurrent Session Usage", concurrent_stats)
     
-    # 4. Check session monitoring stats
+    # 5. Check session monitoring stats
     print("\nSession Monitoring Statistics")
     print("-" * 50)
     stats = get_session_stats()
@@ -210,22 +224,25 @@ def main():
         else:
             print(f"{key}: {value}")
     
-    # 5. Log any active sessions
+    # 6. Log any active sessions
     log_active_sessions()
     
-    # 6. Test API endpoints if requested
+    # 7. Test API endpoints if requested
     if args.api:
         print("\n=== API ENDPOINT PERFORMANCE TESTS ===\n")
-        client = TestClient(app)
-        
-        # Test health endpoint (minimal DB usage)
-        health_stats = test_api_endpoint_performance(client, "/api/v1/health")
-        print_stats("Health Endpoint", health_stats)
-        
-        # Test campaigns endpoint (more DB usage)
-        # Note: This would require authentication in a real scenario
-        # campaigns_stats = test_api_endpoint_performance(client, "/api/v1/campaigns")
-        # print_stats("Campaigns Endpoint", campaigns_stats)
+        # Run app startup once and warm the health route before timing; the
+        # lifespan is shut down when the block exits
+        with TestClient(app) as client:
+            client.get("/api/v1/health")
+            
+            # Test health endpoint (minimal DB usage)
+            health_stats = test_api_endpoint_performance("/api/v1/health", concurrency=args.concurrency)
+            print_stats("Health Endpoint", health_stats)
+            
+            # Test campaigns endpoint (more DB usage)
+            # Note: This would require authentication in a real scenario
+            # campaigns_stats = test_api_endpoint_performance("/api/v1/campaigns", concurrency=args.concurrency)
+            # print_stats("Campaigns Endpoint", campaigns_stats)
 
 
 if __name__ == "__main__":
@@ -4,6 +4,9 @@ Integration tests for email generation and sending endpoints.
 This module contains tests for the email API endpoints.
 """
 
+from datetime import datetime
+
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
@@ -13,6 +16,36 @@ from unittest.mock import patch
 from app import models, schemas
 
 
+# Shared AI generation result returned by the mocked service
+_MOCK_GEN_RESPONSE = schemas.EmailGenResponse(
+    subject="Test Subject",
+    body_text="Test email body in plain text",
+    body_html="<p>Test email body in HTML</p>"
+)
+
+# Smallest valid generation request; optional fields are omitted
+MINIMAL_GEN_REQUEST = {
+    "recipient_name": "John Smith",
+    "industry": "Technology",
+    "pain_points": ["Time management"]
+}
+
+# Smallest bodies that pass schema validation, for requests that are
+# expected to be rejected on the campaign lookup
+LOOKUP_GEN_REQUEST = {
+    "recipient_name": "n",
+    "recipient_email": "x@example.com",
+    "industry": "t",
+    "pain_points": ["p"]
+}
+LOOKUP_SEND_REQUEST = {
+    "recipient_email": "x@example.com",
+    "subject": "s",
+    "body_text": "t",
+    "body_html": "<p>t</p>"
+}
+
+
 @pytest.fixture
 def email_gen_request():
     """Sample email generation request data for testing."""
@@ -40,177 +73,117 @@ def email_send_request():
     }
 
 
+@pytest.fixture
+def email_send_with_campaign(email_send_request, test_campaign):
+    """Email send request data addressed to the test campaign."""
+    email_send_request["campaign_id"] = str(test_campaign.id)
+    return email_send_request
+
+
+@pytest.fixture
+def tracked_email(db: Session, test_campaign: models.EmailCampaign, ids) -> models.Email:
+    """Unopened email with a tracking ID for tracking-pixel tests."""
+    email = models.Email(
+        campaign_id=test_campaign.id,
+        recipient_email="tracked@example.com",
+        recipient_name="Tracked User",
+        subject="Tracked Email",
+        body_text="This email is being tracked",
+        body_html="<p>This email is being tracked</p>",
+        tracking_id=f"track_{ids.tracking}",
+        is_opened=False,
+        num_opens=0
+    )
+    db.add(email)
+    db.commit()
+    db.refresh(email)
+    return email
+
+
 class TestEmailEndpoints:
     """Tests for email endpoints."""
 
-    @patch('app.services.ai_email_generator_service.generate_email')
-    def test_generate_email_content(self, mock_generate, client: TestClient, token_headers: dict, email_gen_request: dict, test_campaign: models.EmailCampaign):
+    @pytest.mark.parametrize(
+        "body, campaign, mock_cfg, expected_status, expected_detail",
+        [
+            pytest.param("full", "valid", {"return_value": _MOCK_GEN_RESPONSE}, 201, None, id="success"),
+            pytest.param("minimal", None, {"return_value": _MOCK_GEN_RESPONSE}, 201, None, id="minimal_data"),
+            pytest.param("lookup", "missing", {}, 404, ("not found",), id="campaign_not_found"),
+            pytest.param("full", None, {"side_effect": Exception("AI service error")}, 500, ("ai", "generation"), id="ai_error"),
+        ]
+    )
+    @pytest.mark.asyncio
+    @patch('app.services.ai_email_generator_service.generate_email', autospec=True)
+    async def test_generate_email_content(
+        self, mock_generate, request, async_client: httpx.AsyncClient, token_headers: dict, email_gen_request: dict, ids,
+        body, campaign, mock_cfg, expected_status, expected_detail
+    ):
         """
-        Test email content generation endpoint.
+        Test the email content generation endpoint.
         
         Arrange:
-            - Prepare email generation data
-            - Set up authentication headers
-            - Mock AI generation service
+            - Prepare full, minimal or lookup-only email generation data
+            - Attach an existing, non-existent, or no campaign ID
+            - Mock the AI generation service result or failure
         
         Act:
             - Send POST request to /api/v1/emails/generate
         
         Assert:
-            - Response status is 201 Created
-            - Generated email content is returned
+            - Response status matches the scenario
+            - Generated content is returned on success
+            - Error detail describes the failure otherwise
         """
         # Arrange
-        # Add campaign_id to request
-        email_gen_request["campaign_id"] = str(test_campaign.id)
-        
-        # Mock the AI service response
-        mock_generate.return_value = schemas.EmailGenResponse(
-            subject="Test Subject",
-            body_text="Test email body in plain text",
-            body_html="<p>Test email body in HTML</p>"
-        )
+        if body == "full":
+            request_body = dict(email_gen_request)
+        elif body == "minimal":
+            request_body = dict(MINIMAL_GEN_REQUEST)
+        else:
+            request_body = dict(LOOKUP_GEN_REQUEST)
+        if campaign == "valid":
+            request_body["campaign_id"] = str(request.getfixturevalue("test_campaign").id)
+        elif campaign == "missing":
+            request_body["campaign_id"] = ids.nonexistent_campaign  # Non-existent ID
+        
+        for attr, value in mock_cfg.items():
+            setattr(mock_generate, attr, value)
         
         # Act
-        response = client.post(
+        response = await async_client.post(
             "/api/v1/emails/generate",
-            json=email_gen_request,
+            json=request_body,
             headers=token_headers
         )
         
         # Assert
-        assert response.status_code == 201
+        assert response.status_code == expected_status
         data = response.json()
-        assert "subject" in data
-        assert "body_text" in data
-        assert "body_html" in data
-        assert data["subject"] == "Test Subject"
-        assert data["body_text"] == "Test email body in plain text"
-        assert data["body_html"] == "<p>Test email body in HTML</p>"
-        
-        # Verify our mock was called with correct args
-        mock_generate.assert_called_once()
-        # Check key parameters were passed correctly
-        call_kwargs = mock_generate.call_args[1]
-        assert call_kwargs["recipient_name"] == email_gen_request["recipient_name"]
-        assert call_kwargs["industry"] == email_gen_request["industry"]
-        assert call_kwargs["pain_points"] == email_gen_request["pain_points"]
-
-    @patch('app.services.ai_email_generator_service.generate_email')
-    def test_generate_email_content_minimal_data(self, mock_generate, client: TestClient, token_headers: dict):
-        """
-        Test email content generation with minimal data.
-        
-        Arrange:
-            - Prepare minimal email generation data
-            - Set up authentication headers
-            - Mock AI generation service
         
-        Act:
-            - Send POST request to /api/v1/emails/generate
+        if expected_detail is not None:
+            assert "detail" in data
+            assert any(word in data["detail"].lower() for word in expected_detail)
+            if campaign == "missing":
+                # Verify our mock was NOT called
+                mock_generate.assert_not_called()
+            return
         
-        Assert:
-            - Response status is 201 Created
-            - Generated email content is returned
-        """
-        # Arrange
-        minimal_request = {
-            "recipient_name": "John Smith",
-            "industry": "Technology",
-            "pain_points": ["Time management"]
-            # Missing optional fields
-        }
-        
-        # Mock the AI service response
-        mock_generate.return_value = schemas.EmailGenResponse(
-            subject="Test Subject",
-            body_text="Test email body in plain text",
-            body_html="<p>Test email body in HTML</p>"
-        )
-        
-        # Act
-        response = client.post(
-            "/api/v1/emails/generate",
-            json=minimal_request,
-            headers=token_headers
-        )
-        
-        # Assert
-        assert response.status_code == 201
-        data = response.json()
-        assert "subject" in data
         assert data["subject"] == "Test Subject"
+        if body == "full":
+            assert data["body_text"] == "Test email body in plain text"
+            assert data["body_html"] == "<p>Test email body in HTML</p>"
+            
+            # Check key parameters were passed correctly
+            mock_generate.assert_called_once()
+            call_kwargs = mock_generate.call_args[1]
+            assert call_kwargs["recipient_name"] == request_body["recipient_name"]
+            assert call_kwargs["industry"] == request_body["industry"]
+            assert call_kwargs["pain_points"] == request_body["pain_points"]
 
-    @patch('app.services.ai_email_generator_service.generate_email')
-    def test_generate_email_content_campaign_not_found(self, mock_generate, client: TestClient, token_headers: dict, email_gen_request: dict):
-        """
-        Test email generation with non-existent campaign.
-        
-        Arrange:
-            - Prepare email generation data with non-existent campaign ID
-            - Set up authentication headers
-        
-        Act:
-            - Send POST request to /api/v1/emails/generate
-        
-        Assert:
-            - Response status is 404 Not Found
-            - Error message indicates campaign not found
-        """
-        # Arrange
-        email_gen_request["campaign_id"] = str(uuid.uuid4())  # Non-existent ID
-        
-        # Act
-        response = client.post(
-            "/api/v1/emails/generate",
-            json=email_gen_request,
-            headers=token_headers
-        )
-        
-        # Assert
-        assert response.status_code == 404
-        data = response.json()
-        assert "detail" in data
-        assert "not found" in data["detail"].lower()
-        
-        # Verify our mock was NOT called
-        mock_generate.assert_not_called()
-
-    @patch('app.services.ai_email_generator_service.generate_email')
-    def test_generate_email_content_ai_error(self, mock_generate, client: TestClient, token_headers: dict, email_gen_request: dict):
-        """
-        Test handling AI service errors during email generation.
-        
-        Arrange:
-            - Prepare email generation data
-            - Set up authentication headers
-            - Mock AI generation service to raise an exception
-        
-        Act:
-            - Send POST request to /api/v1/emails/generate
-        
-        Assert:
-            - Response status is 500 Internal Server Error
-            - Error message indicates AI service failure
-        """
-        # Arrange
-        mock_generate.side_effect = Exception("AI service error")
-        
-        # Act
-        response = client.post(
-            "/api/v1/emails/generate",
-            json=email_gen_request,
-            headers=token_headers
-        )
-        
-        # Assert
-        assert response.status_code == 500
-        data = response.json()
-        assert "detail" in data
-        assert "ai" in data["detail"].lower() or "generation" in data["detail"].lower()
-
-    @patch('app.services.email_service.send_email')
-    def test_send_email(self, mock_send_email, client: TestClient, token_headers: dict, email_send_request: dict, test_campaign: models.EmailCampaign):
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    @patch('app.services.email_service.send_email', autospec=True)
+    async def test_send_email(self, mock_send_email, async_client: httpx.AsyncClient, token_headers: dict, email_send_with_campaign: dict, test_campaign: models.EmailCampaign):
         """
         Test sending an email.
         
@@ -230,13 +203,10 @@ class TestEmailEndpoints:
         # Arrange
         mock_send_email.return_value = True
         
-        # Add campaign_id to request
-        request_data = {**email_send_request, "campaign_id": str(test_campaign.id)}
-        
         # Act
-        response = client.post(
+        response = await async_client.post(
             "/api/v1/emails/send",
-            json=request_data,
+            json=email_send_with_campaign,
             headers=token_headers
         )
         
@@ -244,16 +214,17 @@ class TestEmailEndpoints:
         assert response.status_code == 201
         data = response.json()
         assert "id" in data
-        assert data["recipient_email"] == email_send_request["recipient_email"]
-        assert data["subject"] == email_send_request["subject"]
+        assert data["recipient_email"] == email_send_with_campaign["recipient_email"]
+        assert data["subject"] == email_send_with_campaign["subject"]
         assert data["is_sent"] is True  # Email was sent
         assert data["campaign_id"] == str(test_campaign.id)
         
         # Verify our mock was called
         mock_send_email.assert_called_once()
 
-    @patch('app.services.email_service.send_email')
-    def test_send_email_campaign_not_found(self, mock_send_email, client: TestClient, token_headers: dict, email_send_request: dict):
+    @pytest.mark.asyncio
+    @patch('app.services.email_service.send_email', autospec=True)
+    async def test_send_email_campaign_not_found(self, mock_send_email, async_client: httpx.AsyncClient, token_headers: dict, ids):
         """
         Test sending an email with non-existent campaign.
         
@@ -269,11 +240,11 @@ class TestEmailEndpoints:
             - Error message indicates campaign not found
         """
         # Arrange
-        # Add non-existent campaign_id to request
-        request_data = {**email_send_request, "campaign_id": str(uuid.uuid4())}
+        # Minimal valid body with a non-existent campaign_id
+        request_data = {**LOOKUP_SEND_REQUEST, "campaign_id": ids.nonexistent_campaign}
         
         # Act
-        response = client.post(
+        response = await async_client.post(
             "/api/v1/emails/send",
             json=request_data,
             headers=token_headers
@@ -288,8 +259,9 @@ class TestEmailEndpoints:
         # Verify our mock was NOT called
         mock_send_email.assert_not_called()
 
-    @patch('app.services.email_service.send_email')
-    def test_send_email_failure(self, mock_send_email, client: TestClient, token_headers: dict, email_send_request: dict, test_campaign: models.EmailCampaign):
+    @pytest.mark.asyncio
+    @patch('app.services.email_service.send_email', autospec=True)
+    async def test_send_email_failure(self, mock_send_email, async_client: httpx.AsyncClient, token_headers: dict, email_send_with_campaign: dict):
         """
         Test handling email sending failures.
         
@@ -308,13 +280,10 @@ class TestEmailEndpoints:
         # Arrange
         mock_send_email.return_value = False  # Simulate sending failure
         
-        # Add campaign_id to request
-        request_data = {**email_send_request, "campaign_id": str(test_campaign.id)}
-        
         # Act
-        response = client.post(
+        response = await async_client.post(
             "/api/v1/emails/send",
-            json=request_data,
+            json=email_send_with_campaign,
             headers=token_headers
         )
         
@@ -327,13 +296,14 @@ class TestEmailEndpoints:
         # Verify our mock was called
         mock_send_email.assert_called_once()
 
-    def test_get_campaign_emails(self, client: TestClient, db: Session, test_campaign: models.EmailCampaign, token_headers: dict):
+    @patch('app.services.email_service.get_emails_by_campaign', autospec=True)
+    def test_get_campaign_emails(self, mock_get_emails, client: TestClient, test_campaign: models.EmailCampaign, token_headers: dict):
         """
         Test retrieving emails for a campaign.
         
         Arrange:
             - Create a test campaign
-            - Create test emails for the campaign
+            - Mock the email lookup to return three emails for the campaign
             - Set up authentication headers
         
         Act:
@@ -344,19 +314,21 @@ class TestEmailEndpoints:
             - Response contains list of emails
             - All emails belong to the specified campaign
         """
-        # Arrange - create test emails
-        for i in range(3):
-            email = models.Email(
+        # Arrange - stub the emails instead of inserting rows
+        now = datetime.utcnow()
+        mock_get_emails.return_value = [
+            schemas.EmailInDB(
+                id=uuid.uuid4(),
                 campaign_id=test_campaign.id,
                 recipient_email=f"recipient{i}@example.com",
                 recipient_name=f"Recipient {i}",
                 subject=f"Test Subject {i}",
                 body_text=f"Test body {i}",
                 body_html=f"<p>Test body {i}</p>",
-                tracking_id=f"tracking_{i}_{uuid.uuid4()}"
+                created_at=now
             )
-            db.add(email)
-        db.commit()
+            for i in range(3)
+        ]
         
         # Act
         response = client.get(
@@ -373,8 +345,11 @@ class TestEmailEndpoints:
         # Verify all emails belong to the campaign
         for email in data:
             assert email["campaign_id"] == str(test_campaign.id)
+        
+        mock_get_emails.assert_called_once()
+        assert mock_get_emails.call_args[1]["campaign_id"] == str(test_campaign.id)
 
-    def test_get_campaign_emails_not_found(self, client: TestClient, token_headers: dict):
+    def test_get_campaign_emails_not_found(self, client: TestClient, token_headers: dict, ids):
         """
         Test retrieving emails for a non-existent campaign.
         
@@ -390,7 +365,7 @@ class TestEmailEndpoints:
             - Error message indicates campaign not found
         """
         # Arrange
-        non_existent_id = str(uuid.uuid4())
+        non_existent_id = ids.nonexistent_campaign
         
         # Act
         response = client.get(
@@ -404,7 +379,9 @@ class TestEmailEndpoints:
         assert "detail" in data
         assert "not found" in data["detail"].lower()
 
-    def test_track_email_open(self, client: TestClient, db: Session, test_campaign: models.EmailCampaign):
+    @pytest.mark.integration
+    @pytest.mark.parametrize("n_opens", [1, 3])
+    def test_track_email_open(self, client: TestClient, db: Session, tracked_email: models.Email, n_opens: int):
         """
         Test tracking email opens via tracking pixel.
         
@@ -412,82 +389,28 @@ class TestEmailEndpoints:
             - Create a test email with tracking ID
         
         Act:
-            - Send GET request to /api/v1/emails/track/{tracking_id}.png
+            - Send n_opens GET requests to /api/v1/emails/tracking/{tracking_id}, one after another
         
         Assert:
-            - Response status is 200 OK
-            - Response content type is image/png
-            - Email is marked as opened in database
+            - Every response is 200 OK with the tracking pixel placeholder
+            - Email is marked as opened with num_opens == n_opens
         """
-        # Arrange - create test email with tracking ID
-        tracking_id = f"track_{uuid.uuid4()}"
-        email = models.Email(
-            campaign_id=test_campaign.id,
-            recipient_email="tracked@example.com",
-            recipient_name="Tracked User",
-            subject="Tracked Email",
-            body_text="This email is being tracked",
-            body_html="<p>This email is being tracked</p>",
-            tracking_id=tracking_id,
-            is_opened=False,
-            num_opens=0
-        )
-        db.add(email)
-        db.commit()
-        db.refresh(email)
+        # Arrange
+        tracking_id = tracked_email.tracking_id
         
-        # Act
-        response = client.get(f"/api/v1/emails/track/{tracking_id}.png")
+        # Act - the requests share one session, so send them sequentially
+        responses = [
+            client.get(f"/api/v1/emails/tracking/{tracking_id}") for _ in range(n_opens)
+        ]
         
         # Assert
-        assert response.status_code == 200
-        assert response.headers["content-type"] == "image/png"
-        
-        # Verify email is marked as opened in database
-        updated_email = db.query(models.Email).filter(
-            models.Email.tracking_id == tracking_id
-        ).first()
-        assert updated_email.is_opened is True
-        assert updated_email.num_opens == 1
-
-    def test_track_email_open_multiple(self, client: TestClient, db: Session, test_campaign: models.EmailCampaign):
-        """
-        Test tracking multiple email opens.
-        
-        Arrange:
-            - Create a test email with tracking ID
-        
-        Act:
-            - Send multiple GET requests to tracking pixel
-        
-        Assert:
-            - Email num_opens count is incremented
-        """
-        # Arrange - create test email with tracking ID
-        tracking_id = f"multi_track_{uuid.uuid4()}"
-        email = models.Email(
-            campaign_id=test_campaign.id,
-            recipient_email="multitrack@example.com",
-            recipient_name="Multi Track User",
-            subject="Multi-tracked Email",
-            body_text="This email is being tracked multiple times",
-            body_html="<p>This email is being tracked multiple times</p>",
-            tracking_id=tracking_id,
-            is_opened=False,
-            num_opens=0
-        )
-        db.add(email)
-        db.commit()
-        db.refresh(email)
-        
-        # Act - send 3 tracking requests
-        for _ in range(3):
-            response = client.get(f"/api/v1/emails/track/{tracking_id}.png")
+        for response in responses:
             assert response.status_code == 200
+            assert response.json() == "Tracking pixel"
         
-        # Assert
+        # Verify email is marked as opened in database
         updated_email = db.query(models.Email).filter(
             models.Email.tracking_id == tracking_id
         ).first()
         assert updated_email.is_opened is True
-        assert updated_email.num_opens == 3 
\ No newline at end of file
+        assert updated_email.num_opens == n_opens
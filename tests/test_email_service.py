@@ -5,8 +5,10 @@ This module contains tests for email_service.py functions,
 mocking database dependencies and email sending functionality.
 """
 
+from types import MappingProxyType, SimpleNamespace
+
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch
 from sqlalchemy.exc import SQLAlchemyError
 from uuid import uuid4
 from datetime import datetime, timedelta
@@ -25,103 +27,205 @@ from app.services.email_service import (
     track_email_open,
     delete_email
 )
-from app import schemas, models
+from app import models, schemas
 from app.core.exception_handlers import DatabaseError, EntityNotFoundError
 
+# Everything here is mocked; deprecation noise from the mocked ORM layer is
+# not actionable in these tests.
+pytestmark = pytest.mark.filterwarnings("ignore::DeprecationWarning")
+
+
+class _ChainStub:
+    """
+    Stand-in for a SQLAlchemy ``Query``.
+    
+    Every builder method returns the stub itself, so tests set only the
+    terminal ``first``/``all`` results instead of a chain of return_values.
+    ``get`` (used by ``CRUDBase.remove``) returns the ``first`` result.
+    ``offset``/``limit`` record their arguments for pagination assertions.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clear the stubbed results and recorded pagination arguments."""
+        self.first_value = None
+        self.all_value = []
+        self.offset_args = None
+        self.limit_args = None
+
+    def filter(self, *args, **kwargs):
+        return self
+
+    def join(self, *args, **kwargs):
+        return self
+
+    def order_by(self, *args, **kwargs):
+        return self
+
+    def offset(self, *args):
+        self.offset_args = args
+        return self
+
+    def limit(self, *args):
+        self.limit_args = args
+        return self
+
+    def first(self):
+        return self.first_value
+
+    def get(self, *args):
+        return self.first_value
+
+    def all(self):
+        return self.all_value
+
+
+_SESSION_METHODS = ("add", "commit", "refresh", "delete", "rollback", "query")
+
+
+@pytest.fixture(scope="session")
+def _session_stub_db():
+    """
+    Build the stub SQLAlchemy session once per session.
+    
+    Only the session methods the CRUD layer calls are provided, so a typo'd
+    attribute raises instead of silently spawning a child mock.
+    """
+    chain = _ChainStub()
+    db = SimpleNamespace(**{name: Mock() for name in _SESSION_METHODS})
+    db.query.return_value = chain
+    db.chain = chain
+    return db
+
 
 @pytest.fixture
-def mock_db():
-    """Mock SQLAlchemy database session."""
-    return Mock()
+def stub_db(_session_stub_db):
+    """Stub SQLAlchemy database session, reset for the current test."""
+    for name in _SESSION_METHODS:
+        getattr(_session_stub_db, name).reset_mock(return_value=True, side_effect=True)
+    _session_stub_db.query.return_value = _session_stub_db.chain
+    _session_stub_db.chain.reset()
+    return _session_stub_db
 
 
 @pytest.fixture
-def mock_campaign_id():
-    """Generate a mock campaign ID."""
-    return uuid4()
+def chain(stub_db):
+    """Query stub returned by ``stub_db.query(...)``."""
+    return stub_db.chain
+
+
+_DB_ERR_MSG = "Database error"
+_NOT_FOUND_MSG = "Email not found"
+
+# Allocated once; handle_db_error only reads the message
+_DB_ERR = SQLAlchemyError(_DB_ERR_MSG)
+
+
+def _raised(exc_type, fn, *args):
+    """
+    Call fn and return the exc_type instance it raises.
+    
+    A bare try/except skips the traceback capture pytest.raises does for
+    ExceptionInfo; use it where only the message is checked.
+    """
+    try:
+        fn(*args)
+    except exc_type as exc:
+        return exc
+    pytest.fail(f"{fn.__name__} did not raise {exc_type.__name__}")
 
 
 @pytest.fixture
-def mock_email_id():
-    """Generate a mock email ID."""
-    return uuid4()
+def db_raises_on_query(stub_db):
+    """Stub DB session whose ``query`` raises SQLAlchemyError."""
+    stub_db.query.side_effect = _DB_ERR
+    return stub_db
 
 
 @pytest.fixture
+def db_raises_on_commit(stub_db):
+    """Stub DB session whose ``commit`` raises SQLAlchemyError."""
+    stub_db.commit.side_effect = _DB_ERR
+    return stub_db
+
+
+@pytest.fixture
+def db_raises_on_add(stub_db):
+    """Stub DB session whose ``add`` raises SQLAlchemyError."""
+    stub_db.add.side_effect = _DB_ERR
+    return stub_db
+
+
+# Fixed clock shared by fixtures and the frozen CRUD layer
+_NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _freeze_time():
+    """Freeze the timestamps the email CRUD layer stamps onto records."""
+    with patch("app.crud.email.datetime") as mock_datetime:
+        mock_datetime.utcnow.return_value = _NOW
+        yield
+
+
+@pytest.fixture(scope="session")
 def mock_tracking_id():
     """Generate a mock tracking ID."""
     return "tracking_123456789"
 
 
-@pytest.fixture
-def email_data():
-    """Generate sample email send request data."""
-    return schemas.EmailSendRequest(
-        recipient_email="test@example.com",
-        recipient_name="Test User",
-        subject="Test Subject",
-        body_text="This is a test email.",
-        body_html="<p>This is a test email.</p>",
-        recipient_company="Test Company",
-        recipient_job_title="Test Manager",
-        ab_test_variant="A"
-    )
+@pytest.fixture(scope="session")
+def follow_up_data():
+    """Provide read-only subject/body_text/body_html for a follow-up."""
+    return MappingProxyType({
+        "subject": "Follow-up: Test Subject",
+        "body_text": "This is a follow-up email.",
+        "body_html": "<p>This is a follow-up email.</p>",
+    })
 
 
 @pytest.fixture
-def mock_email(mock_email_id, mock_campaign_id, mock_tracking_id):
+def mock_email(mock_email_factory, mock_email_id, mock_campaign_id, mock_tracking_id):
     """Create a mock email object."""
-    email = MagicMock(spec=models.Email)
-    email.id = mock_email_id
-    email.campaign_id = mock_campaign_id
-    email.recipient_email = "test@example.com"
-    email.recipient_name = "Test User"
-    email.recipient_company = "Test Company"
-    email.recipient_job_title = "Test Manager"
-    email.subject = "Test Subject"
-    email.body_text = "This is a test email."
-    email.body_html = "<p>This is a test email.</p>"
-    email.is_sent = False
-    email.is_opened = False
-    email.is_replied = False
-    email.is_converted = False
-    email.is_follow_up = False
-    email.follow_up_number = 0
-    email.original_email_id = None
-    email.tracking_id = mock_tracking_id
-    email.sent_at = None
-    email.opened_at = None
-    email.replied_at = None
-    email.converted_at = None
-    email.created_at = datetime.now()
-    email.num_opens = 0
-    return email
+    return mock_email_factory(
+        id=mock_email_id,
+        campaign_id=mock_campaign_id,
+        tracking_id=mock_tracking_id,
+        created_at=_NOW,
+    )
 
 
 class TestCreateEmail:
     """Tests for create_email function."""
 
-    def test_create_email_success(self, mock_db, email_data, mock_campaign_id, mock_email):
+    @pytest.fixture
+    def patched_email_model(self, monkeypatch, mock_email):
+        """Patch the Email model to construct mock_email."""
+        mock_model = Mock(return_value=mock_email)
+        monkeypatch.setattr(models, "Email", mock_model)
+        return mock_model
+
+    def test_create_email_success(self, stub_db, email_data, mock_campaign_id, mock_email, patched_email_model):
         """Test successful email creation."""
         # Arrange
-        mock_db.add.return_value = None
-        mock_db.commit.return_value = None
-        mock_db.refresh.return_value = None
-        
-        # Set up the mocked Email to be created
-        with patch('app.models.Email', return_value=mock_email) as mock_model:
-            # Act
-            result = create_email(mock_db, email_data, mock_campaign_id)
-            
-            # Assert
-            mock_db.add.assert_called_once()
-            mock_db.commit.assert_called_once()
-            mock_db.refresh.assert_called_once()
-            assert result == mock_email
-            # Verify model init was called with correct params
-            mock_model.assert_called_once()
-
-    def test_create_email_with_minimal_data(self, mock_db, mock_campaign_id, mock_email):
+        stub_db.add.return_value = None
+        stub_db.commit.return_value = None
+        stub_db.refresh.return_value = None
+        
+        # Act
+        result = create_email(stub_db, email_data, mock_campaign_id)
+        
+        # Assert
+        assert stub_db.add.call_count == 1
+        assert stub_db.commit.call_count == 1
+        assert stub_db.refresh.call_count == 1
+        assert result == mock_email
+        # Verify model init was called with correct params
+        assert patched_email_model.call_count == 1
+
+    def test_create_email_with_minimal_data(self, stub_db, mock_campaign_id, mock_email, patched_email_model):
         """Test email creation with minimal required data."""
         # Arrange
         minimal_data = schemas.EmailSendRequest(
@@ -132,242 +236,198 @@ class TestCreateEmail:
             body_html="<p>Minimal body HTML</p>"
         )
         
-        mock_db.add.return_value = None
-        mock_db.commit.return_value = None
-        mock_db.refresh.return_value = None
-        
-        # Set up the mocked Email to be created
-        with patch('app.models.Email', return_value=mock_email) as mock_model:
-            # Act
-            result = create_email(mock_db, minimal_data, mock_campaign_id)
-            
-            # Assert
-            mock_db.add.assert_called_once()
-            mock_db.commit.assert_called_once()
-            mock_db.refresh.assert_called_once()
-            assert result == mock_email
-
-    def test_create_email_db_error(self, mock_db, email_data, mock_campaign_id):
-        """Test database error handling during email creation."""
-        # Arrange
-        mock_db.add.side_effect = SQLAlchemyError("Database error")
+        stub_db.add.return_value = None
+        stub_db.commit.return_value = None
+        stub_db.refresh.return_value = None
         
-        # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            create_email(mock_db, email_data, mock_campaign_id)
+        # Act
+        result = create_email(stub_db, minimal_data, mock_campaign_id)
         
-        assert "Database error" in str(exc_info.value)
-        mock_db.commit.assert_not_called()
+        # Assert
+        assert stub_db.add.call_count == 1
+        assert stub_db.commit.call_count == 1
+        assert stub_db.refresh.call_count == 1
+        assert result == mock_email
 
 
 class TestGetEmail:
     """Tests for get_email function."""
 
-    def test_get_email_found(self, mock_db, mock_email_id, mock_email):
+    def test_get_email_found(self, chain, stub_db, mock_email_id, mock_email):
         """Test retrieving an existing email."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
+        chain.first_value = mock_email
         
         # Act
-        result = get_email(mock_db, mock_email_id)
+        result = get_email(stub_db, mock_email_id)
         
         # Assert
         assert result == mock_email
-        mock_db.query.assert_called_once()
+        assert stub_db.query.call_count == 1
 
-    def test_get_email_not_found(self, mock_db, mock_email_id):
+    def test_get_email_not_found(self, chain, stub_db, mock_email_id):
         """Test retrieving a non-existent email."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        chain.first_value = None
         
         # Act
-        result = get_email(mock_db, mock_email_id)
+        result = get_email(stub_db, mock_email_id)
         
         # Assert
         assert result is None
-        mock_db.query.assert_called_once()
-
-    def test_get_email_db_error(self, mock_db, mock_email_id):
-        """Test database error handling during email retrieval."""
-        # Arrange
-        mock_db.query.side_effect = SQLAlchemyError("Database error")
-        
-        # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            get_email(mock_db, mock_email_id)
-        
-        assert "Database error" in str(exc_info.value)
+        assert stub_db.query.call_count == 1
 
 
 class TestGetEmailByTrackingId:
     """Tests for get_email_by_tracking_id function."""
 
-    def test_get_email_by_tracking_id_found(self, mock_db, mock_tracking_id, mock_email):
+    def test_get_email_by_tracking_id_found(self, chain, stub_db, mock_tracking_id, mock_email):
         """Test retrieving an email by its tracking ID."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
+        chain.first_value = mock_email
         
         # Act
-        result = get_email_by_tracking_id(mock_db, mock_tracking_id)
+        result = get_email_by_tracking_id(stub_db, mock_tracking_id)
         
         # Assert
         assert result == mock_email
-        mock_db.query.assert_called_once()
+        assert stub_db.query.call_count == 1
 
-    def test_get_email_by_tracking_id_not_found(self, mock_db, mock_tracking_id):
+    def test_get_email_by_tracking_id_not_found(self, chain, stub_db, mock_tracking_id):
         """Test retrieving an email with non-existent tracking ID."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        chain.first_value = None
         
         # Act
-        result = get_email_by_tracking_id(mock_db, mock_tracking_id)
+        result = get_email_by_tracking_id(stub_db, mock_tracking_id)
         
         # Assert
         assert result is None
-        mock_db.query.assert_called_once()
-
-    def test_get_email_by_tracking_id_db_error(self, mock_db, mock_tracking_id):
-        """Test database error handling during email retrieval by tracking ID."""
-        # Arrange
-        mock_db.query.side_effect = SQLAlchemyError("Database error")
-        
-        # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            get_email_by_tracking_id(mock_db, mock_tracking_id)
-        
-        assert "Database error" in str(exc_info.value)
+        assert stub_db.query.call_count == 1
 
 
 class TestGetEmailsByCampaign:
     """Tests for get_emails_by_campaign function."""
 
-    def test_get_emails_by_campaign_success(self, mock_db, mock_campaign_id, mock_email):
+    def test_get_emails_by_campaign_success(self, chain, stub_db, mock_campaign_id, mock_email):
         """Test successfully retrieving emails for a campaign."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.order_by.return_value.offset.return_value.limit.return_value.all.return_value = [mock_email]
+        chain.all_value = [mock_email]
         
         # Act
-        result = get_emails_by_campaign(mock_db, mock_campaign_id)
+        result = get_emails_by_campaign(stub_db, mock_campaign_id)
         
         # Assert
         assert len(result) == 1
         assert result[0] == mock_email
-        mock_db.query.assert_called_once()
+        assert stub_db.query.call_count == 1
 
-    def test_get_emails_by_campaign_empty(self, mock_db, mock_campaign_id):
+    def test_get_emails_by_campaign_empty(self, chain, stub_db, mock_campaign_id):
         """Test retrieving an empty list of emails for a campaign."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.order_by.return_value.offset.return_value.limit.return_value.all.return_value = []
+        chain.all_value = []
         
         # Act
-        result = get_emails_by_campaign(mock_db, mock_campaign_id)
+        result = get_emails_by_campaign(stub_db, mock_campaign_id)
         
         # Assert
         assert len(result) == 0
-        mock_db.query.assert_called_once()
+        assert stub_db.query.call_count == 1
 
-    def test_get_emails_by_campaign_with_pagination(self, mock_db, mock_campaign_id, mock_email):
+    def test_get_emails_by_campaign_with_pagination(self, chain, stub_db, mock_campaign_id, mock_email):
         """Test retrieving emails for a campaign with pagination."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.order_by.return_value.offset.return_value.limit.return_value.all.return_value = [mock_email]
+        chain.all_value = [mock_email]
         
         # Act
-        result = get_emails_by_campaign(mock_db, mock_campaign_id, skip=10, limit=5)
+        result = get_emails_by_campaign(stub_db, mock_campaign_id, skip=10, limit=5)
         
         # Assert
         assert len(result) == 1
         assert result[0] == mock_email
         # Verify that offset and limit were called with correct values
-        mock_db.query.return_value.filter.return_value.order_by.return_value.offset.assert_called_once_with(10)
-        mock_db.query.return_value.filter.return_value.order_by.return_value.offset.return_value.limit.assert_called_once_with(5)
-
-    def test_get_emails_by_campaign_db_error(self, mock_db, mock_campaign_id):
-        """Test database error handling during emails retrieval."""
-        # Arrange
-        mock_db.query.side_effect = SQLAlchemyError("Database error")
-        
-        # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            get_emails_by_campaign(mock_db, mock_campaign_id)
-        
-        assert "Database error" in str(exc_info.value)
-
-
-class TestMarkAsSent:
-    """Tests for mark_as_sent function."""
+        assert chain.offset_args == (10,)
+        assert chain.limit_args == (5,)
+
+
+@pytest.mark.parametrize(
+    "mark_fn, id_fixture, flag_attr, timestamp_attr, not_found_raises",
+    [
+        (mark_as_sent, "mock_email_id", "is_sent", "sent_at", True),
+        (mark_as_replied, "mock_email_id", "is_replied", "replied_at", True),
+        (mark_as_converted, "mock_email_id", "is_converted", "converted_at", True),
+        (mark_as_opened, "mock_tracking_id", "is_opened", "opened_at", False),
+        (track_email_open, "mock_tracking_id", "is_opened", "opened_at", False),
+    ],
+    ids=["sent", "replied", "converted", "opened", "track_open"],
+)
+class TestMarkFunctions:
+    """Shared tests for the mark_as_* status updates and track_email_open."""
 
-    def test_mark_as_sent_success(self, mock_db, mock_email_id, mock_email):
-        """Test successfully marking an email as sent."""
+    def test_success(self, request, chain, stub_db, mock_email, mark_fn, id_fixture,
+                     flag_attr, timestamp_attr, not_found_raises):
+        """Test successfully setting the status flag and its timestamp."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
+        chain.first_value = mock_email
         
         # Act
-        result = mark_as_sent(mock_db, mock_email_id)
+        result = mark_fn(stub_db, request.getfixturevalue(id_fixture))
         
         # Assert
         assert result == mock_email
-        assert result.is_sent is True
-        assert result.sent_at is not None
-        mock_db.add.assert_called_once_with(mock_email)
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once_with(mock_email)
-
-    def test_mark_as_sent_not_found(self, mock_db, mock_email_id):
-        """Test marking a non-existent email as sent."""
-        # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        
-        # Act & Assert
-        with pytest.raises(EntityNotFoundError) as exc_info:
-            mark_as_sent(mock_db, mock_email_id)
-        
-        assert "Email not found" in str(exc_info.value)
-        mock_db.add.assert_not_called()
-        mock_db.commit.assert_not_called()
+        assert getattr(result, flag_attr) is True
+        assert getattr(result, timestamp_attr) == _NOW
+        if flag_attr == "is_opened":
+            assert result.num_opens == 1
+        assert stub_db.add.call_count == 1
+        assert stub_db.commit.call_count == 1
+        assert stub_db.refresh.call_count == 1
 
-    def test_mark_as_sent_db_error(self, mock_db, mock_email_id, mock_email):
-        """Test database error handling when marking an email as sent."""
+    def test_not_found(self, request, chain, stub_db, mark_fn, id_fixture,
+                       flag_attr, timestamp_attr, not_found_raises):
+        """Test updating a non-existent email."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
-        mock_db.commit.side_effect = SQLAlchemyError("Database error")
+        chain.first_value = None
+        identifier = request.getfixturevalue(id_fixture)
         
         # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            mark_as_sent(mock_db, mock_email_id)
-        
-        assert "Database error" in str(exc_info.value)
-
-
-class TestMarkAsOpened:
-    """Tests for mark_as_opened function."""
+        if not_found_raises:
+            with pytest.raises(EntityNotFoundError) as exc_info:
+                mark_fn(stub_db, identifier)
+            assert _NOT_FOUND_MSG in str(exc_info.value)
+        else:
+            assert mark_fn(stub_db, identifier) is None
+        assert stub_db.add.call_count == 0
+        assert stub_db.commit.call_count == 0
 
-    def test_mark_as_opened_success(self, mock_db, mock_tracking_id, mock_email):
-        """Test successfully marking an email as opened."""
+    def test_db_error(self, request, chain, db_raises_on_commit, mock_email, mark_fn, id_fixture,
+                      flag_attr, timestamp_attr, not_found_raises):
+        """Test database error handling when the update fails to commit."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
+        chain.first_value = mock_email
         
         # Act
-        result = mark_as_opened(mock_db, mock_tracking_id)
+        exc = _raised(DatabaseError, mark_fn, db_raises_on_commit, request.getfixturevalue(id_fixture))
         
         # Assert
-        assert result == mock_email
-        assert result.is_opened is True
-        assert result.num_opens == 1
-        assert result.opened_at is not None
-        mock_db.add.assert_called_once_with(mock_email)
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once_with(mock_email)
+        assert _DB_ERR_MSG in str(exc)
+        assert db_raises_on_commit.add.call_count == 1
+        assert db_raises_on_commit.refresh.call_count == 0
 
-    def test_mark_as_opened_multiple_times(self, mock_db, mock_tracking_id, mock_email):
+
+class TestMarkAsOpened:
+    """Tests specific to mark_as_opened."""
+
+    def test_mark_as_opened_multiple_times(self, chain, stub_db, mock_tracking_id, mock_email):
         """Test marking an email as opened multiple times (counts should increment)."""
         # Arrange
         mock_email.is_opened = True
         mock_email.num_opens = 2
-        mock_email.opened_at = datetime.now() - timedelta(days=1)
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
+        mock_email.opened_at = _NOW - timedelta(days=1)
+        chain.first_value = mock_email
         
         # Act
-        result = mark_as_opened(mock_db, mock_tracking_id)
+        result = mark_as_opened(stub_db, mock_tracking_id)
         
         # Assert
         assert result == mock_email
@@ -375,222 +435,110 @@ class TestMarkAsOpened:
         assert result.num_opens == 3  # Incremented from 2 to 3
         # opened_at should not be updated on subsequent opens
         assert result.opened_at == mock_email.opened_at
-        mock_db.add.assert_called_once_with(mock_email)
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once_with(mock_email)
-
-    def test_mark_as_opened_not_found(self, mock_db, mock_tracking_id):
-        """Test marking a non-existent email as opened."""
-        # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        
-        # Act
-        result = mark_as_opened(mock_db, mock_tracking_id)
-        
-        # Assert
-        assert result is None
-        mock_db.add.assert_not_called()
-        mock_db.commit.assert_not_called()
-
-    def test_mark_as_opened_db_error(self, mock_db, mock_tracking_id, mock_email):
-        """Test database error handling when marking an email as opened."""
-        # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
-        mock_db.commit.side_effect = SQLAlchemyError("Database error")
-        
-        # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            mark_as_opened(mock_db, mock_tracking_id)
-        
-        assert "Database error" in str(exc_info.value)
+        assert stub_db.add.call_count == 1
+        assert stub_db.commit.call_count == 1
+        assert stub_db.refresh.call_count == 1
 
 
 class TestMarkAsReplied:
-    """Tests for mark_as_replied function."""
+    """Tests specific to mark_as_replied."""
 
-    def test_mark_as_replied_success(self, mock_db, mock_email_id, mock_email):
-        """Test successfully marking an email as replied."""
-        # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
-        
-        # Act
-        result = mark_as_replied(mock_db, mock_email_id)
-        
-        # Assert
-        assert result == mock_email
-        assert result.is_replied is True
-        assert result.replied_at is not None
-        mock_db.add.assert_called_once_with(mock_email)
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once_with(mock_email)
-
-    def test_mark_as_replied_already_replied(self, mock_db, mock_email_id, mock_email):
+    def test_mark_as_replied_already_replied(self, chain, stub_db, mock_email_id, mock_email):
         """Test marking an already replied email."""
         # Arrange
         mock_email.is_replied = True
-        mock_email.replied_at = datetime.now() - timedelta(days=1)
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
+        mock_email.replied_at = _NOW - timedelta(days=1)
+        chain.first_value = mock_email
         
         # Act
-        result = mark_as_replied(mock_db, mock_email_id)
+        result = mark_as_replied(stub_db, mock_email_id)
         
         # Assert
         assert result == mock_email
         assert result.is_replied is True
         # replied_at should not be updated when already replied
         assert result.replied_at == mock_email.replied_at
-        mock_db.add.assert_called_once_with(mock_email)
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once_with(mock_email)
-
-    def test_mark_as_replied_not_found(self, mock_db, mock_email_id):
-        """Test marking a non-existent email as replied."""
-        # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        
-        # Act & Assert
-        with pytest.raises(EntityNotFoundError) as exc_info:
-            mark_as_replied(mock_db, mock_email_id)
-        
-        assert "not found" in str(exc_info.value)
-        mock_db.add.assert_not_called()
-        mock_db.commit.assert_not_called()
-
-    def test_mark_as_replied_db_error(self, mock_db, mock_email_id, mock_email):
-        """Test database error handling when marking an email as replied."""
-        # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
-        mock_db.commit.side_effect = SQLAlchemyError("Database error")
-        
-        # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            mark_as_replied(mock_db, mock_email_id)
-        
-        assert "Database error" in str(exc_info.value)
+        assert stub_db.add.call_count == 1
+        assert stub_db.commit.call_count == 1
+        assert stub_db.refresh.call_count == 1
 
 
 class TestMarkAsConverted:
-    """Tests for mark_as_converted function."""
-
-    def test_mark_as_converted_success(self, mock_db, mock_email_id, mock_email):
-        """Test successful marking email as converted."""
-        # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
-        mock_email.is_converted = False
-        mock_email.converted_at = None
-        
-        # Act
-        result = mark_as_converted(mock_db, mock_email_id)
-        
-        # Assert
-        assert result == mock_email
-        assert result.is_converted is True
-        assert result.converted_at is not None
-        mock_db.add.assert_called_once()
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once()
+    """Tests specific to mark_as_converted."""
 
-    def test_mark_as_converted_already_converted(self, mock_db, mock_email_id, mock_email):
+    def test_mark_as_converted_already_converted(self, chain, stub_db, mock_email_id, mock_email):
         """Test marking an already converted email."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
+        chain.first_value = mock_email
         mock_email.is_converted = True
-        mock_email.converted_at = datetime.now() - timedelta(days=1)
+        mock_email.converted_at = _NOW - timedelta(days=1)
         
         # Act
-        result = mark_as_converted(mock_db, mock_email_id)
+        result = mark_as_converted(stub_db, mock_email_id)
         
         # Assert
         assert result == mock_email
         assert result.is_converted is True
         # The converted_at timestamp should not change
         assert result.converted_at == mock_email.converted_at
-        mock_db.add.assert_not_called()
-        mock_db.commit.assert_not_called()
-
-    def test_mark_as_converted_not_found(self, mock_db, mock_email_id):
-        """Test marking as converted for non-existent email."""
-        # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        
-        # Act & Assert
-        with pytest.raises(EntityNotFoundError) as exc_info:
-            mark_as_converted(mock_db, mock_email_id)
-        
-        assert "Email not found" in str(exc_info.value)
-        mock_db.add.assert_not_called()
-        mock_db.commit.assert_not_called()
-
-    def test_mark_as_converted_db_error(self, mock_db, mock_email_id, mock_email):
-        """Test database error handling during marking as converted."""
-        # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
-        mock_email.is_converted = False
-        mock_email.converted_at = None
-        mock_db.commit.side_effect = SQLAlchemyError("Database error")
-        
-        # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            mark_as_converted(mock_db, mock_email_id)
-        
-        assert "Database error" in str(exc_info.value)
-        mock_db.add.assert_called_once()
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_not_called()
+        assert stub_db.add.call_count == 0
+        assert stub_db.commit.call_count == 0
 
 
 class TestCreateFollowUp:
     """Tests for create_follow_up function."""
 
-    def test_create_follow_up_success(self, mock_db, mock_email_id, mock_email):
+    @pytest.fixture
+    def patched_email_model(self, monkeypatch):
+        """Patch the Email model; tests set the follow-up it returns."""
+        mock_model = Mock()
+        monkeypatch.setattr(models, "Email", mock_model)
+        return mock_model
+
+    def test_create_follow_up_success(self, chain, stub_db, mock_email_id, mock_email, follow_up_data, patched_email_model):
         """Test successful follow-up creation."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
-        mock_db.add.return_value = None
-        mock_db.commit.return_value = None
-        mock_db.refresh.return_value = None
-        
-        follow_up_data = {
-            "subject": "Follow-up: Test Subject",
-            "body_text": "This is a follow-up email.",
-            "body_html": "<p>This is a follow-up email.</p>",
-        }
+        chain.first_value = mock_email
+        stub_db.add.return_value = None
+        stub_db.commit.return_value = None
+        stub_db.refresh.return_value = None
         
         # Create a mock follow-up email
-        mock_follow_up = MagicMock(spec=models.Email)
-        mock_follow_up.id = uuid4()
-        mock_follow_up.campaign_id = mock_email.campaign_id
-        mock_follow_up.recipient_email = mock_email.recipient_email
-        mock_follow_up.recipient_name = mock_email.recipient_name
-        mock_follow_up.subject = follow_up_data["subject"]
-        mock_follow_up.body_text = follow_up_data["body_text"]
-        mock_follow_up.body_html = follow_up_data["body_html"]
-        mock_follow_up.is_follow_up = True
-        mock_follow_up.follow_up_number = 1
-        mock_follow_up.original_email_id = mock_email_id
-        
-        # Set up the mocked Email to be created
-        with patch('app.models.Email', return_value=mock_follow_up) as mock_model:
-            # Act
-            result = create_follow_up(mock_db, mock_email_id, follow_up_data["subject"], 
-                                     follow_up_data["body_text"], follow_up_data["body_html"])
-            
-            # Assert
-            assert result == mock_follow_up
-            assert result.is_follow_up is True
-            assert result.follow_up_number == 1
-            assert result.original_email_id == mock_email_id
-            mock_db.add.assert_called_once()
-            mock_db.commit.assert_called_once()
-            mock_db.refresh.assert_called_once()
-
-    def test_create_follow_up_for_follow_up(self, mock_db, mock_email_id, mock_email):
+        mock_follow_up = SimpleNamespace(
+            id=uuid4(),
+            campaign_id=mock_email.campaign_id,
+            recipient_email=mock_email.recipient_email,
+            recipient_name=mock_email.recipient_name,
+            subject=follow_up_data["subject"],
+            body_text=follow_up_data["body_text"],
+            body_html=follow_up_data["body_html"],
+            is_follow_up=True,
+            follow_up_number=1,
+            original_email_id=mock_email_id,
+        )
+        
+        patched_email_model.return_value = mock_follow_up
+        
+        # Act
+        result = create_follow_up(stub_db, mock_email_id, follow_up_data["subject"], 
+                                 follow_up_data["body_text"], follow_up_data["body_html"])
+        
+        # Assert
+        assert result == mock_follow_up
+        assert result.is_follow_up is True
+        assert result.follow_up_number == 1
+        assert result.original_email_id == mock_email_id
+        assert stub_db.add.call_count == 1
+        assert stub_db.commit.call_count == 1
+        assert stub_db.refresh.call_count == 1
+
+    def test_create_follow_up_for_follow_up(self, chain, stub_db, mock_email_id, mock_email, patched_email_model):
         """Test creating a follow-up for a follow-up email."""
         # Arrange
         mock_email.is_follow_up = True
         mock_email.follow_up_number = 1
         mock_email.original_email_id = uuid4()
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
+        chain.first_value = mock_email
         
         follow_up_data = {
             "subject": "Follow-up 2: Test Subject",
@@ -599,199 +547,152 @@ class TestCreateFollowUp:
         }
         
         # Create a mock follow-up email
-        mock_follow_up = MagicMock(spec=models.Email)
-        mock_follow_up.id = uuid4()
-        mock_follow_up.campaign_id = mock_email.campaign_id
-        mock_follow_up.recipient_email = mock_email.recipient_email
-        mock_follow_up.recipient_name = mock_email.recipient_name
-        mock_follow_up.subject = follow_up_data["subject"]
-        mock_follow_up.body_text = follow_up_data["body_text"]
-        mock_follow_up.body_html = follow_up_data["body_html"]
-        mock_follow_up.is_follow_up = True
-        mock_follow_up.follow_up_number = 2
-        mock_follow_up.original_email_id = mock_email_id
-        
-        # Set up the mocked Email to be created
-        with patch('app.models.Email', return_value=mock_follow_up) as mock_model:
-            # Act
-            result = create_follow_up(mock_db, mock_email_id, follow_up_data["subject"], 
-                                     follow_up_data["body_text"], follow_up_data["body_html"])
-            
-            # Assert
-            assert result == mock_follow_up
-            assert result.is_follow_up is True
-            assert result.follow_up_number == 2  # Increased from previous follow-up
-            assert result.original_email_id == mock_email_id
-            mock_db.add.assert_called_once()
-            mock_db.commit.assert_called_once()
-            mock_db.refresh.assert_called_once()
-
-    def test_create_follow_up_email_not_found(self, mock_db, mock_email_id):
-        """Test follow-up creation for non-existent email."""
-        # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        mock_follow_up = SimpleNamespace(
+            id=uuid4(),
+            campaign_id=mock_email.campaign_id,
+            recipient_email=mock_email.recipient_email,
+            recipient_name=mock_email.recipient_name,
+            subject=follow_up_data["subject"],
+            body_text=follow_up_data["body_text"],
+            body_html=follow_up_data["body_html"],
+            is_follow_up=True,
+            follow_up_number=2,
+            original_email_id=mock_email_id,
+        )
         
-        follow_up_data = {
-            "subject": "Follow-up: Test Subject",
-            "body_text": "This is a follow-up email.",
-            "body_html": "<p>This is a follow-up email.</p>",
-        }
+        patched_email_model.return_value = mock_follow_up
         
-        # Act & Assert
-        with pytest.raises(EntityNotFoundError) as exc_info:
-            create_follow_up(mock_db, mock_email_id, follow_up_data["subject"], 
-                            follow_up_data["body_text"], follow_up_data["body_html"])
+        # Act
+        result = create_follow_up(stub_db, mock_email_id, follow_up_data["subject"], 
+                                 follow_up_data["body_text"], follow_up_data["body_html"])
         
-        assert "Email not found" in str(exc_info.value)
-        mock_db.add.assert_not_called()
-        mock_db.commit.assert_not_called()
-
-    def test_create_follow_up_db_error(self, mock_db, mock_email_id, mock_email):
-        """Test database error handling during follow-up creation."""
+        # Assert
+        assert result == mock_follow_up
+        assert result.is_follow_up is True
+        assert result.follow_up_number == 2  # Increased from previous follow-up
+        assert result.original_email_id == mock_email_id
+        assert stub_db.add.call_count == 1
+        assert stub_db.commit.call_count == 1
+        assert stub_db.refresh.call_count == 1
+
+    def test_create_follow_up_email_not_found(self, chain, stub_db, mock_email_id, follow_up_data):
+        """Test follow-up creation for non-existent email."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
-        mock_db.add.side_effect = SQLAlchemyError("Database error")
-        
-        follow_up_data = {
-            "subject": "Follow-up: Test Subject",
-            "body_text": "This is a follow-up email.",
-            "body_html": "<p>This is a follow-up email.</p>",
-        }
+        chain.first_value = None
         
         # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            create_follow_up(mock_db, mock_email_id, follow_up_data["subject"], 
+        with pytest.raises(EntityNotFoundError) as exc_info:
+            create_follow_up(stub_db, mock_email_id, follow_up_data["subject"], 
                             follow_up_data["body_text"], follow_up_data["body_html"])
         
-        assert "Database error" in str(exc_info.value)
-        mock_db.commit.assert_not_called()
+        assert _NOT_FOUND_MSG in str(exc_info.value)
+        assert stub_db.add.call_count == 0
+        assert stub_db.commit.call_count == 0
 
 
 class TestGetPendingFollowUps:
     """Tests for get_pending_follow_ups function."""
 
-    def test_get_pending_follow_ups_success(self, mock_db, mock_email, mock_campaign_id):
+    def test_get_pending_follow_ups_success(self, chain, stub_db, mock_email, mock_campaign_id):
         """Test successful retrieval of pending follow-ups."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.all.return_value = [mock_email]
+        chain.all_value = [mock_email]
         
         # Act
-        result = get_pending_follow_ups(mock_db)
+        result = get_pending_follow_ups(stub_db)
         
         # Assert
         assert len(result) == 1
         assert result[0] == mock_email
-        mock_db.query.assert_called_once()
+        assert stub_db.query.call_count == 1
 
-    def test_get_pending_follow_ups_empty(self, mock_db):
+    def test_get_pending_follow_ups_empty(self, chain, stub_db):
         """Test retrieval of pending follow-ups when none are available."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.all.return_value = []
+        chain.all_value = []
         
         # Act
-        result = get_pending_follow_ups(mock_db)
+        result = get_pending_follow_ups(stub_db)
         
         # Assert
         assert len(result) == 0
-        mock_db.query.assert_called_once()
-
-    def test_get_pending_follow_ups_db_error(self, mock_db):
-        """Test database error handling during pending follow-ups retrieval."""
-        # Arrange
-        mock_db.query.side_effect = SQLAlchemyError("Database error")
-        
-        # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            get_pending_follow_ups(mock_db)
-        
-        assert "Database error" in str(exc_info.value)
-
-
-class TestTrackEmailOpen:
-    """Tests for track_email_open function."""
-
-    def test_track_email_open_success(self, mock_db, mock_tracking_id, mock_email):
-        """Test successful tracking of email open."""
-        # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
-        
-        # Act
-        result = track_email_open(mock_db, mock_tracking_id)
-        
-        # Assert
-        assert result == mock_email
-        assert result.is_opened is True
-        assert result.num_opens == 1
-        assert result.opened_at is not None
-        mock_db.add.assert_called_once_with(mock_email)
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once_with(mock_email)
-
-    def test_track_email_open_not_found(self, mock_db, mock_tracking_id):
-        """Test tracking open for non-existent email."""
-        # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        
-        # Act
-        result = track_email_open(mock_db, mock_tracking_id)
-        
-        # Assert
-        assert result is None
-        mock_db.add.assert_not_called()
-        mock_db.commit.assert_not_called()
-
-    def test_track_email_open_db_error(self, mock_db, mock_tracking_id, mock_email):
-        """Test database error handling during open tracking."""
-        # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
-        mock_db.commit.side_effect = SQLAlchemyError("Database error")
-        
-        # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            track_email_open(mock_db, mock_tracking_id)
-        
-        assert "Database error" in str(exc_info.value)
+        assert stub_db.query.call_count == 1
 
 
 class TestDeleteEmail:
     """Tests for delete_email function."""
 
-    def test_delete_email_success(self, mock_db, mock_email_id, mock_email):
+    def test_delete_email_success(self, chain, stub_db, mock_email_id, mock_email):
         """Test successful email deletion."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
+        chain.first_value = mock_email
         
         # Act
-        result = delete_email(mock_db, mock_email_id)
+        result = delete_email(stub_db, mock_email_id)
         
         # Assert
         assert result == mock_email
-        mock_db.delete.assert_called_once_with(mock_email)
-        mock_db.commit.assert_called_once()
+        assert stub_db.delete.call_count == 1
+        assert stub_db.delete.call_args.args == (mock_email,)
+        assert stub_db.commit.call_count == 1
 
-    def test_delete_email_not_found(self, mock_db, mock_email_id):
+    def test_delete_email_not_found(self, chain, stub_db, mock_email_id):
         """Test deleting non-existent email."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        chain.first_value = None
         
         # Act & Assert
         with pytest.raises(EntityNotFoundError) as exc_info:
-            delete_email(mock_db, mock_email_id)
+            delete_email(stub_db, mock_email_id)
         
-        assert "Email not found" in str(exc_info.value)
-        mock_db.delete.assert_not_called()
-        mock_db.commit.assert_not_called()
+        assert _NOT_FOUND_MSG in str(exc_info.value)
+        assert stub_db.delete.call_count == 0
+        assert stub_db.commit.call_count == 0
 
-    def test_delete_email_db_error(self, mock_db, mock_email_id, mock_email):
+    def test_delete_email_db_error(self, chain, db_raises_on_commit, mock_email_id, mock_email):
         """Test database error handling during email deletion."""
         # Arrange
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_email
-        mock_db.commit.side_effect = SQLAlchemyError("Database error")
+        chain.first_value = mock_email
         
-        # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            delete_email(mock_db, mock_email_id)
+        # Act
+        exc = _raised(DatabaseError, delete_email, db_raises_on_commit, mock_email_id)
         
-        assert "Database error" in str(exc_info.value)
-        mock_db.delete.assert_called_once_with(mock_email)
-        mock_db.commit.assert_called_once() 
\ No newline at end of file
+        # Assert
+        assert _DB_ERR_MSG in str(exc)
+        assert db_raises_on_commit.delete.call_count == 1
+        assert db_raises_on_commit.delete.call_args.args == (mock_email,)
+        assert db_raises_on_commit.commit.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "service_fn, resolve_args, db_fixture",
+    [
+        (create_email, lambda fx: (fx("email_data"), fx("mock_campaign_id")), "db_raises_on_add"),
+        (get_email, lambda fx: (fx("mock_email_id"),), "db_raises_on_query"),
+        (get_email_by_tracking_id, lambda fx: (fx("mock_tracking_id"),), "db_raises_on_query"),
+        (get_emails_by_campaign, lambda fx: (fx("mock_campaign_id"),), "db_raises_on_query"),
+        (create_follow_up, lambda fx: (fx("mock_email_id"), *fx("follow_up_data").values()), "db_raises_on_add"),
+        (get_pending_follow_ups, lambda fx: (), "db_raises_on_query"),
+    ],
+    ids=[
+        "create_email",
+        "get_email",
+        "get_email_by_tracking_id",
+        "get_emails_by_campaign",
+        "create_follow_up",
+        "get_pending_follow_ups",
+    ],
+)
+def test_db_error(request, chain, mock_email, service_fn, resolve_args, db_fixture):
+    """Test that a failing session call surfaces as DatabaseError."""
+    # Arrange
+    chain.first_value = mock_email
+    db = request.getfixturevalue(db_fixture)
+    args = resolve_args(request.getfixturevalue)
+    
+    # Act
+    exc = _raised(DatabaseError, service_fn, db, *args)
+    
+    # Assert
+    assert _DB_ERR_MSG in str(exc)
+    assert db.commit.call_count == 0
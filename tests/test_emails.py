@@ -4,112 +4,166 @@ Tests for email generation and sending endpoints.
 This module contains tests for AI email generation and email sending endpoints.
 """
 
+import uuid
+
+import httpx
 import pytest
 from unittest.mock import patch
-from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from app import models
+from app.api.api_v1.endpoints import emails as emails_endpoint
 
 
-@pytest.mark.emails
-def test_generate_email(client: TestClient, token_headers: dict, mock_email_generator):
+# Endpoint tests here only need some authenticated user, so skip JWT decoding
+pytestmark = pytest.mark.usefixtures("current_user_override")
+
+
+# Email routes, built once; the helpers format the per-id paths
+_API = "/api/v1/emails"
+_GENERATE_URL = f"{_API}/generate"
+_SEND_URL = f"{_API}/send"
+
+
+def _email_url(email_id) -> str:
+    return f"{_API}/{email_id}"
+
+
+def _campaign_emails_url(campaign_id) -> str:
+    return f"{_API}/campaign/{campaign_id}"
+
+
+# Base payloads; tests spread them and override only what they vary
+_EMAIL_REQUEST = {
+    "recipient_name": "John Doe",
+    "recipient_company": "Acme Corp",
+    "recipient_job_title": "CTO",
+    "industry": "Technology",
+    "pain_points": ["Time management", "Team productivity"],
+    "personalization_notes": "Met at TechCon 2023"
+}
+
+_SEND_REQUEST = {
+    "recipient_email": "recipient@example.com",
+    "recipient_name": "Email Recipient",
+    "subject": "Test Email Subject",
+    "body_text": "This is a test email body text.",
+    "body_html": "<p>This is a test email body HTML.</p>"
+}
+
+
+class _IncompleteResponse:
+    """AI response missing the required body_text and body_html fields."""
+
+    __slots__ = ("subject",)
+
+    def __init__(self):
+        self.subject = "Test Subject"
+
+
+def _seed_emails(db: Session, campaign_id, n: int) -> None:
     """
-    Test generating an email using the AI service.
-    
-    Arrange:
-        - Prepare email generation request data
-        - Set up authentication headers
-        - Mock the AI email generator
+    Insert n emails for a campaign in a single bulk INSERT.
     
-    Act:
-        - Send POST request to email generation endpoint
-    
-    Assert:
-        - Response status code is 201 Created
-        - Response contains expected email content
+    Args:
+        db: Database session
+        campaign_id: ID of the campaign the emails belong to
+        n: Number of emails to insert
     """
-    # Arrange
-    email_request = {
-        "recipient_name": "John Doe",
-        "recipient_company": "Acme Corp",
-        "recipient_job_title": "CTO",
-        "industry": "Technology",
-        "pain_points": ["Time management", "Team productivity"],
-        "personalization_notes": "Met at TechCon 2023"
-    }
-    
-    # Act
-    response = client.post(
-        "/api/v1/emails/generate", 
-        json=email_request, 
-        headers=token_headers
-    )
-    
-    # Assert
-    assert response.status_code == 201
-    data = response.json()
-    assert "subject" in data
-    assert "body_text" in data
-    assert "body_html" in data
-    assert data["subject"] == "Test Subject Line"
-    assert "test plain text" in data["body_text"].lower()
-    assert "<p>" in data["body_html"]
+    db.bulk_insert_mappings(models.Email, [
+        {
+            "campaign_id": campaign_id,
+            "recipient_email": f"campaign{i}@example.com",
+            "recipient_name": f"Campaign Test {i}",
+            "subject": f"Test Email for Campaign {i}",
+            "body_text": _SEND_REQUEST["body_text"],
+            "body_html": _SEND_REQUEST["body_html"],
+        }
+        for i in range(n)
+    ])
+    db.commit()
+
+
+# Shared by every call to the incomplete-response mock
+_INCOMPLETE_RESPONSE = _IncompleteResponse()
+
+
+def _generate_error(*args, **kwargs):
+    raise Exception("AI service failure")
+
+
+def _generate_incomplete(*args, **kwargs):
+    return _INCOMPLETE_RESPONSE
 
 
 @pytest.mark.emails
-def test_generate_email_with_campaign(client: TestClient, test_campaign: models.Campaign, 
-                                     token_headers: dict, mock_email_generator):
+@pytest.mark.parametrize(
+    "ai_gen_patch, mock_kind, status, detail_substr",
+    [
+        (None, "ok", 201, None),
+        (None, "campaign", 201, None),
+        (_generate_error, "error", 500, "Failed to generate email"),
+        (_generate_incomplete, "incomplete", 422, "incomplete data"),
+    ],
+    ids=["ok", "with_campaign", "service_error", "invalid_response"],
+    indirect=["ai_gen_patch"],
+)
+@pytest.mark.asyncio
+async def test_generate_email(request, async_client: httpx.AsyncClient, ai_gen_patch,
+                              mock_kind: str, status: int, detail_substr):
     """
-    Test generating an email with a campaign context.
+    Test generating an email using the AI service.
     
     Arrange:
-        - Create a test campaign using fixture
-        - Prepare email generation request data with campaign ID
-        - Set up authentication headers
-        - Mock the AI email generator
+        - Build the request from the shared payload, adding a campaign ID
+          for the campaign case
+        - Mock the AI email generator to succeed, or patch it through
+          ai_gen_patch to raise or return a response missing fields
     
     Act:
         - Send POST request to email generation endpoint
     
     Assert:
-        - Response status code is 201 Created
-        - Response contains expected email content
+        - Response status code matches the case
+        - Successful responses contain the generated email content
+        - Failed responses contain the expected error detail
     """
     # Arrange
-    email_request = {
-        "campaign_id": test_campaign.id,
-        "recipient_name": "Jane Smith",
-        "recipient_company": "XYZ Inc",
-        "recipient_job_title": "Marketing Director",
-        "industry": "Marketing",
-        "pain_points": ["ROI tracking", "Campaign automation"],
-        "personalization_notes": "LinkedIn connection"
-    }
+    email_request = {**_EMAIL_REQUEST}
+    if mock_kind in ("ok", "campaign"):
+        request.getfixturevalue("mock_email_generator")
+    if mock_kind == "campaign":
+        email_request["campaign_id"] = request.getfixturevalue("test_campaign").id
     
     # Act
-    response = client.post(
-        "/api/v1/emails/generate", 
-        json=email_request, 
-        headers=token_headers
+    response = await async_client.post(
+        _GENERATE_URL,
+        json=email_request
     )
     
     # Assert
-    assert response.status_code == 201
+    assert response.status_code == status
     data = response.json()
+    if detail_substr is not None:
+        assert detail_substr.lower() in data["detail"].lower()
+        return
     assert "subject" in data
     assert "body_text" in data
     assert "body_html" in data
+    if mock_kind == "ok":
+        assert data["subject"] == "Test Subject Line"
+        assert "test plain text" in data["body_text"].lower()
+        assert "<p>" in data["body_html"]
 
 
 @pytest.mark.emails
-def test_generate_email_campaign_not_found(client: TestClient, token_headers: dict):
+@pytest.mark.asyncio
+async def test_generate_email_campaign_not_found(async_client: httpx.AsyncClient):
     """
     Test generating an email with a non-existent campaign.
     
     Arrange:
         - Prepare email generation request data with non-existent campaign ID
-        - Set up authentication headers
     
     Act:
         - Send POST request to email generation endpoint
@@ -119,21 +173,12 @@ def test_generate_email_campaign_not_found(client: TestClient, token_headers: di
         - Response contains error message about campaign not found
     """
     # Arrange
-    email_request = {
-        "campaign_id": 99999,  # Non-existent campaign
-        "recipient_name": "Bob Johnson",
-        "recipient_company": "123 Industries",
-        "recipient_job_title": "CEO",
-        "industry": "Manufacturing",
-        "pain_points": ["Supply chain", "Cost reduction"],
-        "personalization_notes": "Referred by mutual contact"
-    }
+    email_request = {**_EMAIL_REQUEST, "campaign_id": 99999}  # Non-existent campaign
     
     # Act
-    response = client.post(
-        "/api/v1/emails/generate", 
-        json=email_request, 
-        headers=token_headers
+    response = await async_client.post(
+        _GENERATE_URL,
+        json=email_request
     )
     
     # Assert
@@ -143,111 +188,16 @@ def test_generate_email_campaign_not_found(client: TestClient, token_headers: di
 
 
 @pytest.mark.emails
-def test_generate_email_service_error(client: TestClient, token_headers: dict, monkeypatch):
-    """
-    Test email generation when AI service raises an error.
-    
-    Arrange:
-        - Prepare email generation request data
-        - Set up authentication headers
-        - Mock the AI service to raise an exception
-    
-    Act:
-        - Send POST request to email generation endpoint
-    
-    Assert:
-        - Response status code is 500 Internal Server Error
-        - Response contains generic error message
-    """
-    # Arrange
-    def mock_generate_error(*args, **kwargs):
-        raise Exception("AI service failure")
-    
-    monkeypatch.setattr("app.services.ai_email_generator.generate_email", mock_generate_error)
-    
-    email_request = {
-        "recipient_name": "Error Test",
-        "recipient_company": "Error Corp",
-        "recipient_job_title": "CTO",
-        "industry": "Technology",
-        "pain_points": ["Error handling"],
-        "personalization_notes": "Testing error case"
-    }
-    
-    # Act
-    response = client.post(
-        "/api/v1/emails/generate", 
-        json=email_request, 
-        headers=token_headers
-    )
-    
-    # Assert
-    assert response.status_code == 500
-    data = response.json()
-    assert "Failed to generate email" in data["detail"]
-
-
-@pytest.mark.emails
-def test_generate_email_invalid_response(client: TestClient, token_headers: dict, monkeypatch):
-    """
-    Test email generation when AI service returns invalid response.
-    
-    Arrange:
-        - Prepare email generation request data
-        - Set up authentication headers
-        - Mock the AI service to return incomplete data
-    
-    Act:
-        - Send POST request to email generation endpoint
-    
-    Assert:
-        - Response status code is 422 Unprocessable Entity
-        - Response contains error about incomplete data
-    """
-    # Arrange
-    class IncompleteResponse:
-        # Missing required fields
-        def __init__(self):
-            self.subject = "Test Subject"
-            # Missing body_text and body_html
-    
-    def mock_generate_incomplete(*args, **kwargs):
-        return IncompleteResponse()
-    
-    monkeypatch.setattr("app.services.ai_email_generator.generate_email", mock_generate_incomplete)
-    
-    email_request = {
-        "recipient_name": "Incomplete Test",
-        "recipient_company": "Incomplete Corp",
-        "recipient_job_title": "CTO",
-        "industry": "Technology",
-        "pain_points": ["Incomplete data"],
-        "personalization_notes": "Testing incomplete case"
-    }
-    
-    # Act
-    response = client.post(
-        "/api/v1/emails/generate", 
-        json=email_request, 
-        headers=token_headers
-    )
-    
-    # Assert
-    assert response.status_code == 422
-    data = response.json()
-    assert "incomplete data" in data["detail"].lower()
-
-
-@pytest.mark.emails
-def test_send_email(client: TestClient, test_campaign: models.Campaign, token_headers: dict, 
-                   mock_smtp_client, db: Session):
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_send_email(async_client: httpx.AsyncClient, test_campaign: models.Campaign, 
+                         mock_smtp_client, db: Session):
     """
     Test sending an email.
     
     Arrange:
         - Create a test campaign using fixture
         - Prepare email send request data
-        - Set up authentication headers
         - Mock the SMTP client
     
     Act:
@@ -259,20 +209,12 @@ def test_send_email(client: TestClient, test_campaign: models.Campaign, token_he
         - Email record is created in database
     """
     # Arrange
-    email_request = {
-        "campaign_id": test_campaign.id,
-        "recipient_email": "recipient@example.com",
-        "recipient_name": "Email Recipient",
-        "subject": "Test Email Subject",
-        "body_text": "This is a test email body text.",
-        "body_html": "<p>This is a test email body HTML.</p>"
-    }
+    email_request = {**_SEND_REQUEST, "campaign_id": test_campaign.id}
     
     # Act
-    response = client.post(
-        "/api/v1/emails/send", 
-        json=email_request, 
-        headers=token_headers
+    response = await async_client.post(
+        _SEND_URL,
+        json=email_request
     )
     
     # Assert
@@ -283,23 +225,23 @@ def test_send_email(client: TestClient, test_campaign: models.Campaign, token_he
     assert data["is_sent"] is False  # Will be updated by background task
     
     # Verify email record is created in database
-    email_record = db.query(models.Email).filter(models.Email.id == data["id"]).first()
+    email_record = db.get(models.Email, uuid.UUID(data["id"]))
     assert email_record is not None
     assert email_record.recipient_email == email_request["recipient_email"]
     assert email_record.subject == email_request["subject"]
 
 
 @pytest.mark.emails
-def test_send_email_no_smtp_config(client: TestClient, test_user: models.User, 
-                                  test_campaign: models.Campaign, token_headers: dict, db: Session):
+@pytest.mark.asyncio
+async def test_send_email_no_smtp_config(async_client: httpx.AsyncClient, user_without_smtp: models.User, 
+                                        test_campaign: models.Campaign):
     """
     Test sending an email without SMTP configuration.
     
     Arrange:
         - Create a test campaign using fixture
-        - Remove SMTP configuration from user
+        - Use a test user without SMTP configuration
         - Prepare email send request data
-        - Set up authentication headers
     
     Act:
         - Send POST request to email sending endpoint
@@ -308,50 +250,35 @@ def test_send_email_no_smtp_config(client: TestClient, test_user: models.User,
         - Response status code is 400 Bad Request
         - Response contains error about missing SMTP credentials
     """
-    # Arrange - Remove SMTP configuration
-    test_user.smtp_host = None
-    test_user.smtp_user = None
-    test_user.smtp_password = None
-    db.commit()
-    
+    # Arrange
     email_request = {
+        **_SEND_REQUEST,
         "campaign_id": test_campaign.id,
-        "recipient_email": "recipient@example.com",
         "recipient_name": "No SMTP Config",
         "subject": "Test Email No SMTP",
-        "body_text": "This email shouldn't send due to missing SMTP config.",
-        "body_html": "<p>This email shouldn't send due to missing SMTP config.</p>"
     }
     
     # Act
-    response = client.post(
-        "/api/v1/emails/send", 
-        json=email_request, 
-        headers=token_headers
+    response = await async_client.post(
+        _SEND_URL,
+        json=email_request
     )
     
     # Assert
     assert response.status_code == 400
     data = response.json()
     assert "SMTP credentials not configured" in data["detail"]
-    
-    # Restore SMTP configuration for other tests
-    test_user.smtp_host = "smtp.example.com"
-    test_user.smtp_user = "smtp_user"
-    test_user.smtp_password = "smtp_password"
-    db.commit()
 
 
 @pytest.mark.emails
-def test_send_email_missing_fields(client: TestClient, test_campaign: models.Campaign, 
-                                  token_headers: dict):
+@pytest.mark.asyncio
+async def test_send_email_missing_fields(async_client: httpx.AsyncClient, test_campaign: models.Campaign):
     """
     Test sending an email with missing required fields.
     
     Arrange:
         - Create a test campaign using fixture
         - Prepare email send request with missing required fields
-        - Set up authentication headers
     
     Act:
         - Send POST request to email sending endpoint
@@ -361,20 +288,17 @@ def test_send_email_missing_fields(client: TestClient, test_campaign: models.Cam
         - Response contains validation error details
     """
     # Arrange
+    # Missing recipient_name, subject and body_html
     email_request = {
         "campaign_id": test_campaign.id,
-        "recipient_email": "recipient@example.com",
-        # Missing recipient_name
-        # Missing subject
-        "body_text": "This is a test email body."
-        # Missing body_html
+        "recipient_email": _SEND_REQUEST["recipient_email"],
+        "body_text": _SEND_REQUEST["body_text"],
     }
     
     # Act
-    response = client.post(
-        "/api/v1/emails/send", 
-        json=email_request, 
-        headers=token_headers
+    response = await async_client.post(
+        _SEND_URL,
+        json=email_request
     )
     
     # Assert
@@ -384,45 +308,45 @@ def test_send_email_missing_fields(client: TestClient, test_campaign: models.Cam
 
 
 @pytest.mark.emails
-def test_email_tracking_pixel(client: TestClient, db: Session):
+def test_email_tracking_pixel(db: Session):
     """
     Test the email tracking pixel endpoint.
     
+    The route handler is called directly; the test only checks that it
+    responds, so routing and response serialization are skipped.
+    
     Arrange:
-        - Create an email record with a tracking ID
+        - Create a test tracking ID
     
     Act:
-        - Send GET request to the tracking pixel endpoint
+        - Call the tracking pixel route handler
     
     Assert:
-        - Response status code is 200 OK
-        - Email record is marked as opened in database
+        - Handler returns the tracking pixel
     """
-    # This test would need to create an email record with a tracking ID
-    # For now, we'll just test that the endpoint responds
-    
     # Arrange - Create a test tracking ID
     tracking_id = "test-tracking-123"
     
     # Act
-    response = client.get(f"/api/v1/emails/tracking/{tracking_id}")
+    response = emails_endpoint.track_email_open(db=db, tracking_id=tracking_id)
     
     # Assert
-    assert response.status_code == 200
+    assert response == "Tracking pixel"
     
     # Note: We would ideally check that the email was marked as opened,
     # but that would require creating a real email record with this tracking ID
 
 
 @pytest.mark.emails
-def test_get_email_metrics(client: TestClient, test_campaign: models.Campaign, 
-                          token_headers: dict, db: Session):
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_get_email_metrics(async_client: httpx.AsyncClient, test_campaign: models.Campaign, 
+                                db: Session):
     """
     Test retrieving email metrics.
     
     Arrange:
         - Create a test email record
-        - Set up authentication headers
     
     Act:
         - Send GET request to the email metrics endpoint
@@ -442,27 +366,24 @@ def test_get_email_metrics(client: TestClient, test_campaign: models.Campaign,
     
     # Arrange - Send a test email
     email_request = {
+        **_SEND_REQUEST,
         "campaign_id": test_campaign.id,
         "recipient_email": "metrics@example.com",
         "recipient_name": "Metrics Test",
         "subject": "Test Email for Metrics",
-        "body_text": "This is a test email for getting metrics.",
-        "body_html": "<p>This is a test email for getting metrics.</p>"
     }
     
-    send_response = client.post(
-        "/api/v1/emails/send", 
-        json=email_request, 
-        headers=token_headers
+    send_response = await async_client.post(
+        _SEND_URL,
+        json=email_request
     )
     
     assert send_response.status_code == 201
     email_id = send_response.json()["id"]
     
     # Act - Get the email metrics
-    response = client.get(
-        f"/api/v1/emails/{email_id}", 
-        headers=token_headers
+    response = await async_client.get(
+        _email_url(email_id)
     )
     
     # Assert
@@ -476,50 +397,42 @@ def test_get_email_metrics(client: TestClient, test_campaign: models.Campaign,
 
 
 @pytest.mark.emails
-def test_get_campaign_emails(client: TestClient, test_campaign: models.Campaign, 
-                            token_headers: dict):
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_get_campaign_emails(async_client: httpx.AsyncClient, test_campaign: models.Campaign, 
+                                  db: Session):
     """
     Test retrieving all emails for a campaign.
     
     Arrange:
         - Create a test campaign using fixture
-        - Send test emails for the campaign
-        - Set up authentication headers
+        - Seed emails for the campaign directly in the database
+        - Send one more email through the API
     
     Act:
         - Send GET request to the campaign emails endpoint
     
     Assert:
         - Response status code is 200 OK
-        - Response contains list of emails for the campaign
+        - Response contains the seeded and the sent emails
     """
-    # Arrange - Send a couple of test emails
-    for i in range(2):
-        email_request = {
-            "campaign_id": test_campaign.id,
-            "recipient_email": f"campaign{i}@example.com",
-            "recipient_name": f"Campaign Test {i}",
-            "subject": f"Test Email for Campaign {i}",
-            "body_text": f"This is test email {i} for the campaign.",
-            "body_html": f"<p>This is test email {i} for the campaign.</p>"
-        }
-        
-        send_response = client.post(
-            "/api/v1/emails/send", 
-            json=email_request, 
-            headers=token_headers
-        )
-        
-        assert send_response.status_code == 201
+    # Arrange - Seed two emails in one round trip, send one through the API
+    _seed_emails(db, test_campaign.id, 2)
+    
+    send_response = await async_client.post(
+        _SEND_URL,
+        json={**_SEND_REQUEST, "campaign_id": test_campaign.id}
+    )
+    
+    assert send_response.status_code == 201
     
     # Act - Get all emails for the campaign
-    response = client.get(
-        f"/api/v1/emails/campaign/{test_campaign.id}", 
-        headers=token_headers
+    response = await async_client.get(
+        _campaign_emails_url(test_campaign.id)
     )
     
     # Assert
     assert response.status_code == 200
     data = response.json()
     assert isinstance(data, list)
-    assert len(data) >= 2  # Should have at least our 2 test emails 
\ No newline at end of file
+    assert len(data) >= 3  # The 2 seeded emails plus the one sent
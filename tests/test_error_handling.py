@@ -11,85 +11,60 @@ from app.utils.error_handling import (
 )
 
 
+# Built once at import; handle_db_error only reads them
+_ERR_DUPLICATE_EMAIL = IntegrityError(
+    "statement", "params", Exception("duplicate key value violates unique constraint on email")
+)
+_ERR_UNIQUE_CONSTRAINT = IntegrityError(
+    "statement", "params", Exception("duplicate key value violates unique constraint")
+)
+_ERR_FOREIGN_KEY = IntegrityError("statement", "params", Exception("violates foreign key constraint"))
+_ERR_DB_LOCKED = OperationalError("statement", "params", Exception("database is locked"))
+_ERR_GENERIC = SQLAlchemyError("Some generic error")
+
+
 @pytest.mark.utils
 @pytest.mark.error_handling
 @pytest.mark.unit
 class TestErrorHandlingUtils:
-    def test_handle_db_error_integrity_error_duplicate_email(self):
-        """Test handling of IntegrityError with duplicate email."""
-        # Arrange
-        error = IntegrityError(
-            "statement", 
-            "params", 
-            Exception("duplicate key value violates unique constraint on email")
-        )
-        
-        # Act & Assert
-        with pytest.raises(HTTPException) as exc_info:
-            handle_db_error(error, "create", "user")
-        
-        assert exc_info.value.status_code == status.HTTP_409_CONFLICT
-        assert "email already exists" in exc_info.value.detail.lower()
-    
-    def test_handle_db_error_integrity_error_unique_constraint(self):
-        """Test handling of IntegrityError with generic unique constraint violation."""
-        # Arrange
-        error = IntegrityError(
-            "statement", 
-            "params", 
-            Exception("duplicate key value violates unique constraint")
-        )
-        
-        # Act & Assert
-        with pytest.raises(HTTPException) as exc_info:
-            handle_db_error(error, "create", "campaign")
-        
-        assert exc_info.value.status_code == status.HTTP_409_CONFLICT
-        assert "already exists" in exc_info.value.detail.lower()
-    
-    def test_handle_db_error_integrity_error_foreign_key(self):
-        """Test handling of IntegrityError with foreign key constraint violation."""
-        # Arrange
-        error = IntegrityError(
-            "statement", 
-            "params", 
-            Exception("violates foreign key constraint")
-        )
-        
-        # Act & Assert
-        with pytest.raises(HTTPException) as exc_info:
-            handle_db_error(error, "create", "email")
-        
-        assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
-        assert "does not exist" in exc_info.value.detail.lower()
-    
-    def test_handle_db_error_operational_error(self):
-        """Test handling of OperationalError."""
-        # Arrange
-        error = OperationalError(
-            "statement", 
-            "params", 
-            Exception("database is locked")
-        )
-        
+    @pytest.mark.parametrize(
+        "error, operation, entity, expected_status, expected_substr",
+        [
+            pytest.param(
+                _ERR_DUPLICATE_EMAIL,
+                "create", "user", status.HTTP_409_CONFLICT, "email already exists",
+                id="integrity_duplicate_email",
+            ),
+            pytest.param(
+                _ERR_UNIQUE_CONSTRAINT,
+                "create", "campaign", status.HTTP_409_CONFLICT, "already exists",
+                id="integrity_unique_constraint",
+            ),
+            pytest.param(
+                _ERR_FOREIGN_KEY,
+                "create", "email", status.HTTP_400_BAD_REQUEST, "does not exist",
+                id="integrity_foreign_key",
+            ),
+            pytest.param(
+                _ERR_DB_LOCKED,
+                "update", "campaign", status.HTTP_500_INTERNAL_SERVER_ERROR, "database error occurred",
+                id="operational_error",
+            ),
+            pytest.param(
+                _ERR_GENERIC,
+                "delete", "user", status.HTTP_500_INTERNAL_SERVER_ERROR, "database error occurred while delete user",
+                id="generic_error",
+            ),
+        ],
+    )
+    def test_handle_db_error(self, error, operation, entity, expected_status, expected_substr):
+        """Test mapping of SQLAlchemy errors to HTTP status codes and messages."""
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
-            handle_db_error(error, "update", "campaign")
+            handle_db_error(error, operation, entity)
         
-        assert exc_info.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
-        assert "database error occurred" in exc_info.value.detail.lower()
-    
-    def test_handle_db_error_generic_error(self):
-        """Test handling of generic SQLAlchemy error."""
-        # Arrange
-        error = SQLAlchemyError("Some generic error")
-        
-        # Act & Assert
-        with pytest.raises(HTTPException) as exc_info:
-            handle_db_error(error, "delete", "user")
-        
-        assert exc_info.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
-        assert "database error occurred while delete user" in exc_info.value.detail.lower()
+        assert exc_info.value.status_code == expected_status
+        assert expected_substr in exc_info.value.detail.lower()
     
     def test_handle_db_error_custom_detail(self):
         """Test handling error with custom detail message."""
@@ -6,11 +6,13 @@ mocking database dependencies and email handling functionality.
 """
 
 import pytest
+from types import SimpleNamespace
 from unittest.mock import Mock, patch, MagicMock
 from sqlalchemy.exc import SQLAlchemyError
 from uuid import uuid4
 from datetime import datetime, timedelta
 
+from app.services import follow_up_service
 from app.services.follow_up_service import (
     generate_follow_up_email,
     schedule_follow_ups,
@@ -20,73 +22,64 @@ from app import schemas, models
 from app.core.exception_handlers import DatabaseError, EntityNotFoundError, PermissionDeniedError
 
 
-@pytest.fixture
-def mock_db():
-    """Mock SQLAlchemy database session."""
-    return Mock()
-
-
-@pytest.fixture
-def mock_user_id():
-    """Generate a mock user ID."""
-    return uuid4()
+# Fixed timestamps; the service compares them with the real clock, so they
+# stay well past every follow-up delay
+_NOW = datetime(2024, 1, 1, 12, 0, 0)
+_SENT_AT = _NOW - timedelta(days=7)
+_OPENED_AT = _NOW - timedelta(days=5)
+_SENT_8_DAYS_AGO = _NOW - timedelta(days=8)
 
 
 @pytest.fixture
-def mock_campaign_id():
-    """Generate a mock campaign ID."""
-    return uuid4()
-
-
-@pytest.fixture
-def mock_email_id():
-    """Generate a mock email ID."""
-    return uuid4()
-
-
-@pytest.fixture
-def mock_email(mock_email_id, mock_campaign_id, mock_user_id):
-    """Create a mock email object."""
-    email = MagicMock(spec=models.Email)
-    email.id = mock_email_id
-    email.campaign_id = mock_campaign_id
-    email.user_id = mock_user_id
-    email.recipient_email = "test@example.com"
-    email.recipient_name = "Test User"
-    email.subject = "Test Subject"
-    email.body_text = "This is a test email."
-    email.body_html = "<p>This is a test email.</p>"
-    email.is_sent = True
-    email.is_opened = True
-    email.is_replied = False
-    email.is_converted = False
-    email.is_follow_up = False
-    email.follow_up_number = 0
-    email.original_email_id = None
-    email.sent_at = datetime.now() - timedelta(days=7)
-    email.opened_at = datetime.now() - timedelta(days=5)
-    email.replied_at = None
-    email.created_at = datetime.now() - timedelta(days=7)
-    return email
+def mock_email(mock_email_factory, mock_email_id, mock_campaign_id, mock_user_id):
+    """Create a mock sent-and-opened email."""
+    return mock_email_factory(
+        id=mock_email_id,
+        campaign_id=mock_campaign_id,
+        user_id=mock_user_id,
+        is_sent=True,
+        is_opened=True,
+        sent_at=_SENT_AT,
+        opened_at=_OPENED_AT,
+        created_at=_SENT_AT,
+    )
 
 
 @pytest.fixture
 def mock_campaign(mock_campaign_id, mock_user_id):
     """Create a mock campaign object."""
     campaign = MagicMock(spec=models.EmailCampaign)
-    campaign.id = mock_campaign_id
-    campaign.user_id = mock_user_id
-    campaign.name = "Test Campaign"
-    campaign.follow_up_days = [3, 7, 14]  # Follow up after 3, 7, and 14 days
-    campaign.max_follow_ups = 3
-    campaign.follow_up_template = "Following up on my previous email. {original_message}"
-    campaign.is_active = True
+    campaign.configure_mock(
+        id=mock_campaign_id,
+        user_id=mock_user_id,
+        name="Test Campaign",
+        follow_up_days=[3, 7, 14],  # Follow up after 3, 7, and 14 days
+        max_follow_ups=3,
+        follow_up_template="Following up on my previous email. {original_message}",
+        is_active=True,
+    )
     return campaign
 
 
+@pytest.fixture(scope="class")
+def _follow_up_deps_mocks():
+    """Build the follow-up service's collaborator mocks once per test class."""
+    return SimpleNamespace(email_service=MagicMock(), generate_follow_up=MagicMock())
+
+
 @pytest.fixture
+def follow_up_deps(_follow_up_deps_mocks):
+    """Patch email_service and generate_follow_up with the class's mocks, reset for this test."""
+    for mock in vars(_follow_up_deps_mocks).values():
+        mock.reset_mock(return_value=True, side_effect=True)
+    # Patching the module object directly skips resolving a dotted target path
+    with patch.multiple(follow_up_service, **vars(_follow_up_deps_mocks)):
+        yield _follow_up_deps_mocks
+
+
+@pytest.fixture(scope="session")
 def follow_up_request():
-    """Create a follow-up request object."""
+    """Create a follow-up request object once; tests only read it."""
     return schemas.FollowUpRequest(
         email_id=uuid4(),
         days_delay=5,
@@ -99,13 +92,13 @@ def follow_up_request():
 class TestGenerateFollowUpEmail:
     """Tests for generate_follow_up_email function."""
 
-    @patch('app.services.follow_up_service.email_service')
-    @patch('app.services.follow_up_service.ai_email_generator_service')
-    def test_generate_follow_up_email_with_ai(self, mock_ai_service, mock_email_service, 
-                                           mock_db, mock_email_id, mock_email, mock_user_id):
+    def test_generate_follow_up_email_with_ai(self, follow_up_deps, mock_db, mock_email_id,
+                                              mock_email, mock_user_id):
         """Test generating a follow-up email using AI service."""
         # Arrange
-        mock_db.query().filter().first.return_value = mock_email
+        mock_generate_follow_up = follow_up_deps.generate_follow_up
+        mock_email_service = follow_up_deps.email_service
+        mock_db.chain.first.return_value = mock_email
         mock_campaign = MagicMock()
         mock_campaign.id = mock_email.campaign_id
         mock_campaign.user_id = mock_user_id
@@ -116,7 +109,7 @@ class TestGenerateFollowUpEmail:
             body_text="This is an AI-generated follow-up email.",
             body_html="<p>This is an AI-generated follow-up email.</p>"
         )
-        mock_ai_service.generate_follow_up.return_value = mock_response
+        mock_generate_follow_up.return_value = mock_response
         
         # Mock the create_follow_up call
         mock_follow_up = MagicMock(spec=models.Email)
@@ -136,7 +129,7 @@ class TestGenerateFollowUpEmail:
         # Assert
         assert result == mock_follow_up
         # Verify AI service was called
-        mock_ai_service.generate_follow_up.assert_called_once()
+        mock_generate_follow_up.assert_called_once()
         # Verify email service was called with AI-generated content
         mock_email_service.create_follow_up.assert_called_once_with(
             mock_db,
@@ -146,12 +139,12 @@ class TestGenerateFollowUpEmail:
             mock_response.body_html
         )
 
-    @patch('app.services.follow_up_service.email_service')
-    def test_generate_follow_up_email_with_template(self, mock_email_service, 
-                                               mock_db, mock_email_id, mock_email, mock_campaign, mock_user_id):
+    def test_generate_follow_up_email_with_template(self, follow_up_deps, mock_db, mock_email_id,
+                                                    mock_email, mock_campaign, mock_user_id):
         """Test generating a follow-up email using a template."""
         # Arrange
-        mock_db.query().filter().first.side_effect = [mock_email, mock_campaign]
+        mock_email_service = follow_up_deps.email_service
+        mock_db.chain.first.side_effect = [mock_email, mock_campaign]
         
         # Mock the create_follow_up call
         mock_follow_up = MagicMock(spec=models.Email)
@@ -179,12 +172,12 @@ class TestGenerateFollowUpEmail:
         assert call_args[2].startswith("Re: ")
         assert "Follow" in call_args[3]  # Template content in body
 
-    @patch('app.services.follow_up_service.email_service')
-    def test_generate_follow_up_email_with_custom_content(self, mock_email_service, 
-                                                    mock_db, mock_email_id, mock_email, mock_user_id, follow_up_request):
+    def test_generate_follow_up_email_with_custom_content(self, follow_up_deps, mock_db, mock_email_id,
+                                                          mock_email, mock_user_id, follow_up_request):
         """Test generating a follow-up email with custom content."""
         # Arrange
-        mock_db.query().filter().first.return_value = mock_email
+        mock_email_service = follow_up_deps.email_service
+        mock_db.chain.first.return_value = mock_email
         
         # Mock the create_follow_up call
         mock_follow_up = MagicMock(spec=models.Email)
@@ -216,7 +209,7 @@ class TestGenerateFollowUpEmail:
     def test_generate_follow_up_email_not_found(self, mock_db, mock_email_id, mock_user_id):
         """Test generating a follow-up for a non-existent email."""
         # Arrange
-        mock_db.query().filter().first.return_value = None
+        mock_db.chain.first.return_value = None
         
         # Act & Assert
         with pytest.raises(EntityNotFoundError) as exc_info:
@@ -229,7 +222,7 @@ class TestGenerateFollowUpEmail:
         # Arrange
         different_user_id = uuid4()
         mock_email.user_id = different_user_id
-        mock_db.query().filter().first.return_value = mock_email
+        mock_db.chain.first.return_value = mock_email
         
         # Act & Assert
         with pytest.raises(PermissionDeniedError) as exc_info:
@@ -237,17 +230,6 @@ class TestGenerateFollowUpEmail:
         
         assert "You don't have permission" in str(exc_info.value)
 
-    def test_generate_follow_up_email_db_error(self, mock_db, mock_email_id, mock_user_id):
-        """Test database error handling during follow-up generation."""
-        # Arrange
-        mock_db.query.side_effect = SQLAlchemyError("Database error")
-        
-        # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            generate_follow_up_email(mock_db, mock_email_id, mock_user_id)
-        
-        assert "Database error" in str(exc_info.value)
-
 
 class TestScheduleFollowUps:
     """Tests for schedule_follow_ups function."""
@@ -257,26 +239,23 @@ class TestScheduleFollowUps:
         """Test successfully scheduling follow-ups for multiple emails."""
         # Arrange
         # Create multiple emails for the campaign
-        emails = [mock_email]
-        for i in range(2):
-            email = MagicMock(spec=models.Email)
-            email.id = uuid4()
-            email.campaign_id = mock_campaign_id
-            email.is_sent = True
-            email.is_replied = False
-            email.is_converted = False
-            email.sent_at = datetime.now() - timedelta(days=8)  # Sent 8 days ago
-            email.is_follow_up = False
-            email.follow_up_number = 0
-            
-            # Mock that each email has already had one follow-up
-            email.follow_ups = [MagicMock()]
-            
-            emails.append(email)
+        base = dict(
+            campaign_id=mock_campaign_id,
+            is_sent=True,
+            is_replied=False,
+            is_converted=False,
+            sent_at=_SENT_8_DAYS_AGO,
+            is_follow_up=False,
+            follow_up_number=0,
+        )
+        # Each email has already had one follow-up
+        emails = [mock_email] + [
+            MagicMock(id=uuid4(), follow_ups=[MagicMock()], **base) for _ in range(2)
+        ]
         
         # Configure mocks
-        mock_db.query().filter().first.return_value = mock_campaign
-        mock_db.query().filter().all.return_value = emails
+        mock_db.chain.first.return_value = mock_campaign
+        mock_db.chain.all.return_value = emails
         
         # Create mock scheduled follow-ups
         scheduled_follow_ups = []
@@ -302,20 +281,21 @@ class TestScheduleFollowUps:
         """Test scheduling follow-ups when no emails are eligible."""
         # Arrange
         # Create emails that are not eligible for follow-up (replied or converted)
-        emails = []
-        for i in range(3):
-            email = MagicMock(spec=models.Email)
-            email.id = uuid4()
-            email.campaign_id = mock_campaign_id
-            email.is_sent = True
-            email.is_replied = True if i % 2 == 0 else False
-            email.is_converted = True if i % 2 == 1 else False
-            email.sent_at = datetime.now() - timedelta(days=8)
-            emails.append(email)
+        emails = [
+            MagicMock(
+                id=uuid4(),
+                campaign_id=mock_campaign_id,
+                is_sent=True,
+                is_replied=i % 2 == 0,
+                is_converted=i % 2 == 1,
+                sent_at=_SENT_8_DAYS_AGO,
+            )
+            for i in range(3)
+        ]
         
         # Configure mocks
-        mock_db.query().filter().first.return_value = mock_campaign
-        mock_db.query().filter().all.return_value = emails
+        mock_db.chain.first.return_value = mock_campaign
+        mock_db.chain.all.return_value = emails
         
         # Act
         result = schedule_follow_ups(mock_db, mock_campaign_id)
@@ -333,29 +313,22 @@ class TestScheduleFollowUps:
         mock_campaign.max_follow_ups = 2
         
         # Create email that already has 2 follow-ups
-        email = MagicMock(spec=models.Email)
-        email.id = uuid4()
-        email.campaign_id = mock_campaign_id
-        email.is_sent = True
-        email.is_replied = False
-        email.is_converted = False
-        email.sent_at = datetime.now() - timedelta(days=8)
-        
-        # Create 2 mock follow-ups for this email
-        follow_up1 = MagicMock()
-        follow_up1.id = uuid4()
-        follow_up1.is_follow_up = True
-        follow_up1.follow_up_number = 1
-        follow_up2 = MagicMock()
-        follow_up2.id = uuid4()
-        follow_up2.is_follow_up = True
-        follow_up2.follow_up_number = 2
-        
-        email.follow_ups = [follow_up1, follow_up2]
+        email = MagicMock(
+            id=uuid4(),
+            campaign_id=mock_campaign_id,
+            is_sent=True,
+            is_replied=False,
+            is_converted=False,
+            sent_at=_SENT_8_DAYS_AGO,
+            follow_ups=[
+                MagicMock(id=uuid4(), is_follow_up=True, follow_up_number=n)
+                for n in (1, 2)
+            ],
+        )
         
         # Configure mocks
-        mock_db.query().filter().first.return_value = mock_campaign
-        mock_db.query().filter().all.return_value = [email]
+        mock_db.chain.first.return_value = mock_campaign
+        mock_db.chain.all.return_value = [email]
         
         # Act
         result = schedule_follow_ups(mock_db, mock_campaign_id)
@@ -368,7 +341,7 @@ class TestScheduleFollowUps:
     def test_schedule_follow_ups_campaign_not_found(self, mock_db, mock_campaign_id):
         """Test scheduling follow-ups for a non-existent campaign."""
         # Arrange
-        mock_db.query().filter().first.return_value = None
+        mock_db.chain.first.return_value = None
         
         # Act & Assert
         with pytest.raises(EntityNotFoundError) as exc_info:
@@ -376,28 +349,17 @@ class TestScheduleFollowUps:
         
         assert "Campaign not found" in str(exc_info.value)
 
-    def test_schedule_follow_ups_db_error(self, mock_db, mock_campaign_id):
-        """Test database error handling during follow-up scheduling."""
-        # Arrange
-        mock_db.query.side_effect = SQLAlchemyError("Database error")
-        
-        # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            schedule_follow_ups(mock_db, mock_campaign_id)
-        
-        assert "Database error" in str(exc_info.value)
-
 
 class TestSendAutomatedFollowUp:
     """Tests for send_automated_follow_up function."""
 
-    @patch('app.services.follow_up_service.email_sender_service')
-    @patch('app.services.follow_up_service.email_service')
+    @patch('app.services.follow_up_service.email_sender_service', new_callable=Mock)
+    @patch('app.services.follow_up_service.email_service', new_callable=Mock)
     def test_send_automated_follow_up_success(self, mock_email_service, mock_sender_service, 
                                          mock_db, mock_email_id, mock_email):
         """Test successfully sending an automated follow-up email."""
         # Arrange
-        mock_db.query().filter().first.return_value = mock_email
+        mock_db.chain.first.return_value = mock_email
         
         # Mock successful email sending
         mock_sender_service.send_email.return_value = True
@@ -418,11 +380,11 @@ class TestSendAutomatedFollowUp:
         assert call_args["body_text"] == mock_email.body_text
         assert call_args["body_html"] == mock_email.body_html
 
-    @patch('app.services.follow_up_service.email_sender_service')
+    @patch('app.services.follow_up_service.email_sender_service', new_callable=Mock)
     def test_send_automated_follow_up_email_not_found(self, mock_sender_service, mock_db, mock_email_id):
         """Test sending a follow-up for a non-existent email."""
         # Arrange
-        mock_db.query().filter().first.return_value = None
+        mock_db.chain.first.return_value = None
         
         # Act & Assert
         with pytest.raises(EntityNotFoundError) as exc_info:
@@ -432,14 +394,14 @@ class TestSendAutomatedFollowUp:
         # Verify no email was sent
         mock_sender_service.send_email.assert_not_called()
 
-    @patch('app.services.follow_up_service.email_sender_service')
-    @patch('app.services.follow_up_service.email_service')
+    @patch('app.services.follow_up_service.email_sender_service', new_callable=Mock)
+    @patch('app.services.follow_up_service.email_service', new_callable=Mock)
     def test_send_automated_follow_up_already_sent(self, mock_email_service, mock_sender_service, 
                                              mock_db, mock_email_id, mock_email):
         """Test sending a follow-up that has already been sent."""
         # Arrange
         mock_email.is_sent = True
-        mock_db.query().filter().first.return_value = mock_email
+        mock_db.chain.first.return_value = mock_email
         
         # Act
         result = send_automated_follow_up(mock_db, mock_email_id)
@@ -450,14 +412,14 @@ class TestSendAutomatedFollowUp:
         mock_email_service.mark_as_sent.assert_not_called()
         mock_sender_service.send_email.assert_not_called()
 
-    @patch('app.services.follow_up_service.email_sender_service')
-    @patch('app.services.follow_up_service.email_service')
+    @patch('app.services.follow_up_service.email_sender_service', new_callable=Mock)
+    @patch('app.services.follow_up_service.email_service', new_callable=Mock)
     def test_send_automated_follow_up_send_failure(self, mock_email_service, mock_sender_service, 
                                              mock_db, mock_email_id, mock_email):
         """Test handling email sending failure."""
         # Arrange
         mock_email.is_sent = False
-        mock_db.query().filter().first.return_value = mock_email
+        mock_db.chain.first.return_value = mock_email
         
         # Mock failed email sending
         mock_sender_service.send_email.return_value = False
@@ -472,13 +434,24 @@ class TestSendAutomatedFollowUp:
         # Verify email was not marked as sent
         mock_email_service.mark_as_sent.assert_not_called()
 
-    def test_send_automated_follow_up_db_error(self, mock_db, mock_email_id):
-        """Test database error handling during follow-up sending."""
-        # Arrange
-        mock_db.query.side_effect = SQLAlchemyError("Database error")
-        
-        # Act & Assert
-        with pytest.raises(DatabaseError) as exc_info:
-            send_automated_follow_up(mock_db, mock_email_id)
-        
-        assert "Database error" in str(exc_info.value) 
\ No newline at end of file
+
+@pytest.mark.parametrize(
+    "service_fn, resolve_args",
+    [
+        (generate_follow_up_email, lambda fx: (fx("mock_email_id"), fx("mock_user_id"))),
+        (schedule_follow_ups, lambda fx: (fx("mock_campaign_id"),)),
+        (send_automated_follow_up, lambda fx: (fx("mock_email_id"),)),
+    ],
+    ids=["generate_follow_up_email", "schedule_follow_ups", "send_automated_follow_up"],
+)
+def test_db_error(request, mock_db, service_fn, resolve_args):
+    """Test that a failing query surfaces as DatabaseError."""
+    # Arrange
+    mock_db.query.side_effect = SQLAlchemyError("Database error")
+    args = resolve_args(request.getfixturevalue)
+    
+    # Act & Assert
+    with pytest.raises(DatabaseError) as exc_info:
+        service_fn(mock_db, *args)
+    
+    assert "Database error" in str(exc_info.value)
@@ -6,110 +6,140 @@ mocking database dependencies and ensuring proper statistics calculations.
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import patch
 from sqlalchemy.exc import SQLAlchemyError
 from uuid import uuid4
 from datetime import datetime
+from types import SimpleNamespace
 
 from app.services.stats_service import (
     get_campaign_stats,
     get_user_stats,
     calculate_ab_test_results
 )
-from app import schemas, models
+from app import schemas
 from app.core.exception_handlers import DatabaseError, EntityNotFoundError, PermissionDeniedError
 
 
-@pytest.fixture
-def mock_db():
-    """Mock SQLAlchemy database session."""
-    return Mock()
+# Fixed timestamp so campaign fields are identical from run to run
+_NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+# The service only reads campaign and email attributes, so plain namespaces
+# stand in for the models
+_CAMPAIGN_FIELDS = dict(
+    name="Test Campaign",
+    description="A test campaign",
+    target_audience="Software developers",
+    is_active=True,
+    created_at=_NOW,
+    updated_at=_NOW,
+    total_emails=100,
+    opened_emails=50,
+    replied_emails=20,
+    converted_emails=10,
+    ab_test_active=True,
+    ab_test_variants={"A": "Version A", "B": "Version B"},
+)
 
 
 @pytest.fixture
-def mock_user_id():
-    """Generate a mock user ID."""
-    return uuid4()
+def mock_campaign(mock_campaign_id, mock_user_id):
+    """Create a mock campaign object."""
+    return SimpleNamespace(id=mock_campaign_id, user_id=mock_user_id, **_CAMPAIGN_FIELDS)
 
 
-@pytest.fixture
-def mock_campaign_id():
-    """Generate a mock campaign ID."""
-    return uuid4()
+def _build_campaigns(user_id, n=2):
+    """
+    Build n extra campaigns for the user, numbered after the mock campaign.
+    
+    Their totals grow with the index so each campaign has distinct rates.
+    """
+    return [
+        SimpleNamespace(
+            id=uuid4(),
+            user_id=user_id,
+            name=f"Test Campaign {i+2}",
+            total_emails=50 + i*20,
+            opened_emails=25 + i*10,
+            replied_emails=10 + i*5,
+            converted_emails=5 + i*2,
+            ab_test_active=False,
+            ab_test_variants=None,
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(scope="module")
+def sample_campaigns(mock_user_id):
+    """Provide the user's campaigns besides the mock campaign, built once per module."""
+    return _build_campaigns(mock_user_id)
+
+
+# Email IDs are never read by the service; groups reuse them from index 0
+_EMAIL_IDS = tuple(uuid4() for _ in range(30))
+
+
+def _variant_emails(variant, n, opened, replied, converted):
+    """
+    Build n sent emails for one A/B variant.
+    
+    The first ``opened``/``replied``/``converted`` emails get the matching
+    flag set, so the counts translate directly into rates.
+    """
+    return [
+        SimpleNamespace(
+            id=_EMAIL_IDS[i],
+            ab_test_variant=variant,
+            is_sent=True,
+            is_opened=i < opened,
+            is_replied=i < replied,
+            is_converted=i < converted,
+        )
+        for i in range(n)
+    ]
+
+
+# (variant, sent, opened, replied, converted) for each group of mock emails:
+# A converts at 10%, B at 20%, and the control group (no variant) at 10%
+_AB_GROUPS = (
+    ("A", 30, 15, 9, 3),
+    ("B", 30, 21, 12, 6),
+    (None, 20, 10, 6, 2),
+)
 
+# Per-variant keys compared by the A/B results tests, in expected-tuple order
+_AB_STAT_KEYS = ("sent", "opened", "replied", "converted", "open_rate", "reply_rate", "conversion_rate")
 
-@pytest.fixture
-def mock_campaign(mock_campaign_id, mock_user_id):
-    """Create a mock campaign object."""
-    campaign = MagicMock(spec=models.EmailCampaign)
-    campaign.id = mock_campaign_id
-    campaign.user_id = mock_user_id
-    campaign.name = "Test Campaign"
-    campaign.description = "A test campaign"
-    campaign.target_audience = "Software developers"
-    campaign.is_active = True
-    campaign.created_at = datetime.now()
-    campaign.updated_at = datetime.now()
-    campaign.total_emails = 100
-    campaign.opened_emails = 50
-    campaign.replied_emails = 20
-    campaign.converted_emails = 10
-    campaign.ab_test_active = True
-    campaign.ab_test_variants = {"A": "Version A", "B": "Version B"}
-    return campaign
+
+def _group_emails(groups):
+    """Flatten (variant, sent, opened, replied, converted) groups into mock emails."""
+    return [email for group in groups for email in _variant_emails(*group)]
 
 
 @pytest.fixture
 def mock_emails():
     """Create a list of mock email objects for testing stats."""
-    emails = []
-    
-    # Create 30 "A" variant emails
-    for i in range(30):
-        email = MagicMock(spec=models.Email)
-        email.id = uuid4()
-        email.ab_test_variant = "A"
-        email.is_sent = True
-        # Set different open/reply/conversion rates for each variant
-        email.is_opened = i < 15  # 15/30 = 50% open rate
-        email.is_replied = i < 9  # 9/30 = 30% reply rate
-        email.is_converted = i < 3  # 3/30 = 10% conversion rate
-        emails.append(email)
-    
-    # Create 30 "B" variant emails
-    for i in range(30):
-        email = MagicMock(spec=models.Email)
-        email.id = uuid4()
-        email.ab_test_variant = "B"
-        email.is_sent = True
-        # Set different open/reply/conversion rates for each variant
-        email.is_opened = i < 21  # 21/30 = 70% open rate
-        email.is_replied = i < 12  # 12/30 = 40% reply rate
-        email.is_converted = i < 6  # 6/30 = 20% conversion rate
-        emails.append(email)
-    
-    # Create 20 emails with no variant (control group)
-    for i in range(20):
-        email = MagicMock(spec=models.Email)
-        email.id = uuid4()
-        email.ab_test_variant = None
-        email.is_sent = True
-        email.is_opened = i < 10  # 10/20 = 50% open rate
-        email.is_replied = i < 6  # 6/20 = 30% reply rate
-        email.is_converted = i < 2  # 2/20 = 10% conversion rate
-        emails.append(email)
-    
-    return emails
+    return _group_emails(_AB_GROUPS)
 
 
+@pytest.fixture
+def mock_ab_results():
+    """Patch calculate_ab_test_results; tests set its return_value."""
+    with patch('app.services.stats_service.calculate_ab_test_results') as mock:
+        yield mock
+
+
+@pytest.mark.stats
 class TestGetCampaignStats:
     """Tests for get_campaign_stats function."""
 
-    def test_get_campaign_stats_success(self, mock_db, mock_campaign_id, mock_user_id, mock_campaign, mock_emails):
+    def test_get_campaign_stats_success(self, mock_db, mock_campaign_id, mock_user_id, mock_campaign, mock_emails,
+                                        mock_ab_results):
         """Test successfully retrieving campaign statistics."""
         # Arrange
-        mock_db.query().filter().first.return_value = mock_campaign
-        mock_db.query().filter().all.return_value = mock_emails
+        mock_db.chain.first.return_value = mock_campaign
+        mock_db.chain.all.return_value = mock_emails
         
         # Mock the calculate_ab_test_results function
         ab_test_results = {
@@ -120,26 +150,27 @@ class TestGetCampaignStats:
             "winner": "B"
         }
         
-        with patch('app.services.stats_service.calculate_ab_test_results', return_value=ab_test_results):
-            # Act
-            result = get_campaign_stats(mock_db, mock_campaign_id, mock_user_id)
-            
-            # Assert
-            assert result.campaign_id == mock_campaign_id
-            assert result.name == mock_campaign.name
-            assert result.total_emails == mock_campaign.total_emails
-            assert result.opened_emails == mock_campaign.opened_emails
-            assert result.replied_emails == mock_campaign.replied_emails
-            assert result.converted_emails == mock_campaign.converted_emails
-            assert result.open_rate == 50.0  # 50/100 = 50%
-            assert result.reply_rate == 20.0  # 20/100 = 20%
-            assert result.conversion_rate == 10.0  # 10/100 = 10%
-            assert result.ab_test_results == ab_test_results
+        mock_ab_results.return_value = ab_test_results
+        
+        # Act
+        result = get_campaign_stats(mock_db, mock_campaign_id, mock_user_id)
+        
+        # Assert
+        assert result.campaign_id == mock_campaign_id
+        assert result.name == mock_campaign.name
+        assert result.total_emails == mock_campaign.total_emails
+        assert result.opened_emails == mock_campaign.opened_emails
+        assert result.replied_emails == mock_campaign.replied_emails
+        assert result.converted_emails == mock_campaign.converted_emails
+        assert result.open_rate == 50.0  # 50/100 = 50%
+        assert result.reply_rate == 20.0  # 20/100 = 20%
+        assert result.conversion_rate == 10.0  # 10/100 = 10%
+        assert result.ab_test_results == ab_test_results
 
     def test_get_campaign_stats_campaign_not_found(self, mock_db, mock_campaign_id, mock_user_id):
         """Test retrieving stats for a non-existent campaign."""
         # Arrange
-        mock_db.query().filter().first.return_value = None
+        mock_db.chain.first.return_value = None
         
         # Act & Assert
         with pytest.raises(EntityNotFoundError) as exc_info:
@@ -151,7 +182,7 @@ class TestGetCampaignStats:
         """Test retrieving stats for a campaign the user doesn't own."""
         # Arrange
         mock_campaign.user_id = uuid4()  # Different from mock_user_id
-        mock_db.query().filter().first.return_value = mock_campaign
+        mock_db.chain.first.return_value = mock_campaign
         
         # Act & Assert
         with pytest.raises(PermissionDeniedError) as exc_info:
@@ -163,7 +194,7 @@ class TestGetCampaignStats:
         """Test retrieving stats for a campaign without A/B testing."""
         # Arrange
         mock_campaign.ab_test_active = False
-        mock_db.query().filter().first.return_value = mock_campaign
+        mock_db.chain.first.return_value = mock_campaign
         
         # Act
         result = get_campaign_stats(mock_db, mock_campaign_id, mock_user_id)
@@ -184,46 +215,36 @@ class TestGetCampaignStats:
         assert "Database error" in str(exc_info.value)
 
 
+@pytest.mark.stats
 class TestGetUserStats:
     """Tests for get_user_stats function."""
 
-    def test_get_user_stats_success(self, mock_db, mock_user_id, mock_campaign):
+    def test_get_user_stats_success(self, mock_db, mock_user_id, mock_campaign, sample_campaigns):
         """Test successfully retrieving user statistics."""
         # Arrange
-        # Create multiple campaigns for the user
-        campaigns = [mock_campaign]
-        for i in range(2):
-            campaign = MagicMock(spec=models.EmailCampaign)
-            campaign.id = uuid4()
-            campaign.user_id = mock_user_id
-            campaign.name = f"Test Campaign {i+2}"
-            campaign.total_emails = 50 + i*20
-            campaign.opened_emails = 25 + i*10
-            campaign.replied_emails = 10 + i*5
-            campaign.converted_emails = 5 + i*2
-            campaign.ab_test_active = False
-            campaigns.append(campaign)
-        
-        mock_db.query().filter().all.return_value = campaigns
+        campaigns = [mock_campaign, *sample_campaigns]
+        
+        mock_db.chain.all.return_value = campaigns
+        
+        # Mock get_campaign_stats to return predefined stats, built once per campaign
+        stats_by_id = {
+            c.id: schemas.CampaignStats(
+                campaign_id=c.id,
+                name=c.name,
+                total_emails=c.total_emails,
+                opened_emails=c.opened_emails,
+                replied_emails=c.replied_emails,
+                converted_emails=c.converted_emails,
+                open_rate=c.opened_emails / c.total_emails * 100 if c.total_emails else 0,
+                reply_rate=c.replied_emails / c.total_emails * 100 if c.total_emails else 0,
+                conversion_rate=c.converted_emails / c.total_emails * 100 if c.total_emails else 0,
+                ab_test_results=None
+            )
+            for c in campaigns
+        }
         
-        # Mock get_campaign_stats to return predefined stats
         def mock_get_stats(db, campaign_id, user_id):
-            for c in campaigns:
-                if c.id == campaign_id:
-                    stats = schemas.CampaignStats(
-                        campaign_id=c.id,
-                        name=c.name,
-                        total_emails=c.total_emails,
-                        opened_emails=c.opened_emails,
-                        replied_emails=c.replied_emails,
-                        converted_emails=c.converted_emails,
-                        open_rate=c.opened_emails / c.total_emails * 100 if c.total_emails else 0,
-                        reply_rate=c.replied_emails / c.total_emails * 100 if c.total_emails else 0,
-                        conversion_rate=c.converted_emails / c.total_emails * 100 if c.total_emails else 0,
-                        ab_test_results=None
-                    )
-                    return stats
-            return None
+            return stats_by_id.get(campaign_id)
         
         with patch('app.services.stats_service.get_campaign_stats', side_effect=mock_get_stats):
             # Act
@@ -240,7 +261,7 @@ class TestGetUserStats:
     def test_get_user_stats_no_campaigns(self, mock_db, mock_user_id):
         """Test retrieving stats when user has no campaigns."""
         # Arrange
-        mock_db.query().filter().all.return_value = []
+        mock_db.chain.all.return_value = []
         
         # Act
         result = get_user_stats(mock_db, mock_user_id)
@@ -248,19 +269,12 @@ class TestGetUserStats:
         # Assert
         assert len(result) == 0
 
-    def test_get_user_stats_with_errors(self, mock_db, mock_user_id, mock_campaign):
+    def test_get_user_stats_with_errors(self, mock_db, mock_user_id, mock_campaign, sample_campaigns):
         """Test handling errors for individual campaigns during stats retrieval."""
         # Arrange
-        # Create multiple campaigns for the user
-        campaigns = [mock_campaign]
-        for i in range(2):
-            campaign = MagicMock(spec=models.EmailCampaign)
-            campaign.id = uuid4()
-            campaign.user_id = mock_user_id
-            campaign.name = f"Test Campaign {i+2}"
-            campaigns.append(campaign)
+        campaigns = [mock_campaign, *sample_campaigns]
         
-        mock_db.query().filter().all.return_value = campaigns
+        mock_db.chain.all.return_value = campaigns
         
         # Mock get_campaign_stats to raise an error for one campaign
         def mock_get_stats(db, campaign_id, user_id):
@@ -304,47 +318,53 @@ class TestGetUserStats:
         assert "Database error" in str(exc_info.value)
 
 
+@pytest.mark.stats
 class TestCalculateABTestResults:
     """Tests for calculate_ab_test_results function."""
 
-    def test_calculate_ab_test_results_success(self, mock_db, mock_campaign_id, mock_emails):
-        """Test successful A/B test results calculation."""
+    @pytest.mark.parametrize(
+        "groups, expected, winner",
+        [
+            pytest.param(
+                _AB_GROUPS,
+                {"A": (30, 15, 9, 3, 50.0, 30.0, 10.0), "B": (30, 21, 12, 6, 70.0, 40.0, 20.0)},
+                "B",
+                id="b_wins",
+            ),
+            # With only one variant, there is no winner
+            pytest.param(
+                (("A", 20, 10, 6, 3),),
+                {"A": (20, 10, 6, 3, 50.0, 30.0, 15.0)},
+                None,
+                id="single_variant",
+            ),
+            # In case of a tie, there is no clear winner
+            pytest.param(
+                (("A", 20, 10, 6, 2), ("B", 20, 10, 6, 2)),
+                {"A": (20, 10, 6, 2, 50.0, 30.0, 10.0), "B": (20, 10, 6, 2, 50.0, 30.0, 10.0)},
+                None,
+                id="equal_performance",
+            ),
+        ],
+    )
+    def test_calculate_ab_test_results(self, mock_db, mock_campaign_id, groups, expected, winner):
+        """Test per-variant stats and winner selection for A/B test results."""
         # Arrange
-        mock_db.query().filter().all.return_value = mock_emails
+        mock_db.chain.all.return_value = _group_emails(groups)
         
         # Act
         result = calculate_ab_test_results(mock_db, mock_campaign_id)
         
         # Assert
-        assert "A" in result
-        assert "B" in result
-        assert "winner" in result
-        
-        # Check variant A stats
-        assert result["A"]["sent"] == 30
-        assert result["A"]["opened"] == 15
-        assert result["A"]["replied"] == 9
-        assert result["A"]["converted"] == 3
-        assert result["A"]["open_rate"] == 50.0
-        assert result["A"]["reply_rate"] == 30.0
-        assert result["A"]["conversion_rate"] == 10.0
-        
-        # Check variant B stats (should be winning)
-        assert result["B"]["sent"] == 30
-        assert result["B"]["opened"] == 21
-        assert result["B"]["replied"] == 12
-        assert result["B"]["converted"] == 6
-        assert result["B"]["open_rate"] == 70.0
-        assert result["B"]["reply_rate"] == 40.0
-        assert result["B"]["conversion_rate"] == 20.0
-        
-        # Check that B is the winner
-        assert result["winner"] == "B"
+        # Compare the whole result at once so unexpected extra keys fail too
+        expected_result = {variant: dict(zip(_AB_STAT_KEYS, stats)) for variant, stats in expected.items()}
+        expected_result["winner"] = winner
+        assert result == expected_result
 
     def test_calculate_ab_test_results_no_emails(self, mock_db, mock_campaign_id):
         """Test A/B test results calculation with no emails."""
         # Arrange
-        mock_db.query().filter().all.return_value = []
+        mock_db.chain.all.return_value = []
         
         # Act
         result = calculate_ab_test_results(mock_db, mock_campaign_id)
@@ -352,69 +372,6 @@ class TestCalculateABTestResults:
         # Assert
         assert result == {"winner": None}
 
-    def test_calculate_ab_test_results_single_variant(self, mock_db, mock_campaign_id):
-        """Test A/B test results calculation with only one variant."""
-        # Arrange
-        emails = []
-        # Create 20 "A" variant emails only
-        for i in range(20):
-            email = MagicMock(spec=models.Email)
-            email.id = uuid4()
-            email.ab_test_variant = "A"
-            email.is_sent = True
-            email.is_opened = i < 10
-            email.is_replied = i < 6
-            email.is_converted = i < 3
-            emails.append(email)
-            
-        mock_db.query().filter().all.return_value = emails
-        
-        # Act
-        result = calculate_ab_test_results(mock_db, mock_campaign_id)
-        
-        # Assert
-        assert "A" in result
-        assert result["A"]["sent"] == 20
-        assert result["A"]["opened"] == 10
-        assert result["A"]["replied"] == 6
-        assert result["A"]["converted"] == 3
-        assert result["A"]["open_rate"] == 50.0
-        assert result["A"]["reply_rate"] == 30.0
-        assert result["A"]["conversion_rate"] == 15.0
-        
-        # With only one variant, there is no winner
-        assert result["winner"] == None
-
-    def test_calculate_ab_test_results_equal_performance(self, mock_db, mock_campaign_id):
-        """Test A/B test results calculation with variants performing equally."""
-        # Arrange
-        emails = []
-        # Create 20 emails for each variant with identical stats
-        for variant in ["A", "B"]:
-            for i in range(20):
-                email = MagicMock(spec=models.Email)
-                email.id = uuid4()
-                email.ab_test_variant = variant
-                email.is_sent = True
-                email.is_opened = i < 10  # 50% open rate
-                email.is_replied = i < 6   # 30% reply rate
-                email.is_converted = i < 2  # 10% conversion rate
-                emails.append(email)
-            
-        mock_db.query().filter().all.return_value = emails
-        
-        # Act
-        result = calculate_ab_test_results(mock_db, mock_campaign_id)
-        
-        # Assert
-        # Both variants should have the same stats
-        assert result["A"]["open_rate"] == result["B"]["open_rate"]
-        assert result["A"]["reply_rate"] == result["B"]["reply_rate"]
-        assert result["A"]["conversion_rate"] == result["B"]["conversion_rate"]
-        
-        # In case of a tie, there is no clear winner
-        assert result["winner"] is None
-
     def test_calculate_ab_test_results_db_error(self, mock_db, mock_campaign_id):
         """Test database error handling during A/B test calculation."""
         # Arrange
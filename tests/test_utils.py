@@ -7,7 +7,6 @@ from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 from app.utils.validation import validate_campaign_access
 from app.utils.error_handling import handle_db_error
-from app.services.ai_email_generator import generate_email, call_openai_api, parse_email_response
 
 
 # ==================== Tests for validate_campaign_access ====================
@@ -90,48 +89,48 @@ class TestValidateCampaignAccess:
 
 
 # ==================== Tests for handle_db_error ====================
+# Built once at import; handle_db_error only reads them
+_ERR_DUPLICATE_EMAIL = IntegrityError(
+    "statement", "params", Exception("duplicate key value violates unique constraint on email")
+)
+_ERR_UNIQUE_CONSTRAINT = IntegrityError(
+    "statement", "params", Exception("duplicate key value violates unique constraint")
+)
+_ERR_FOREIGN_KEY = IntegrityError("statement", "params", Exception("violates foreign key constraint"))
+
+
 @pytest.mark.utils
 @pytest.mark.error_handling
 @pytest.mark.unit
 class TestHandleDBError:
-    def test_integrity_error_duplicate_email(self):
-        """Test handling of IntegrityError with duplicate email."""
-        # Arrange
-        error = IntegrityError("statement", "params", 
-                              Exception("duplicate key value violates unique constraint on email"))
-        
+    @pytest.mark.parametrize(
+        "error, entity, expected_status, expected_substr",
+        [
+            pytest.param(
+                _ERR_DUPLICATE_EMAIL,
+                "user", 409, "email already exists",
+                id="duplicate_email",
+            ),
+            pytest.param(
+                _ERR_UNIQUE_CONSTRAINT,
+                "campaign", 409, "already exists",
+                id="unique_constraint",
+            ),
+            pytest.param(
+                _ERR_FOREIGN_KEY,
+                "email", 400, "does not exist",
+                id="foreign_key",
+            ),
+        ],
+    )
+    def test_integrity_error(self, error, entity, expected_status, expected_substr):
+        """Test handling of IntegrityError for each kind of constraint violation."""
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
-            handle_db_error(error, "create", "user")
+            handle_db_error(error, "create", entity)
         
-        assert exc_info.value.status_code == 409
-        assert "email already exists" in exc_info.value.detail.lower()
-    
-    def test_integrity_error_unique_constraint(self):
-        """Test handling of IntegrityError with generic unique constraint violation."""
-        # Arrange
-        error = IntegrityError("statement", "params", 
-                              Exception("duplicate key value violates unique constraint"))
-        
-        # Act & Assert
-        with pytest.raises(HTTPException) as exc_info:
-            handle_db_error(error, "create", "campaign")
-        
-        assert exc_info.value.status_code == 409
-        assert "already exists" in exc_info.value.detail.lower()
-    
-    def test_integrity_error_foreign_key(self):
-        """Test handling of IntegrityError with foreign key constraint violation."""
-        # Arrange
-        error = IntegrityError("statement", "params", 
-                              Exception("violates foreign key constraint"))
-        
-        # Act & Assert
-        with pytest.raises(HTTPException) as exc_info:
-            handle_db_error(error, "create", "email")
-        
-        assert exc_info.value.status_code == 400
-        assert "does not exist" in exc_info.value.detail.lower()
+        assert exc_info.value.status_code == expected_status
+        assert expected_substr in exc_info.value.detail.lower()
     
     def test_generic_db_error(self):
         """Test handling of generic SQLAlchemy error."""
@@ -160,30 +159,50 @@ class TestHandleDBError:
 
 
 # ==================== Tests for generate_email ====================
+_EXPECTED_EMAIL = {
+    "subject": "Test Subject",
+    "body_text": "Test body text",
+    "body_html": "<p>Test body HTML</p>"
+}
+
+# AI message payloads, encoded once; the incomplete one lacks both bodies
+_VALID_PAYLOAD = json.dumps(_EXPECTED_EMAIL)
+_INCOMPLETE_PAYLOAD = json.dumps({"subject": "Test Subject"})
+
+
+def _openai_response(content):
+    """Build a chat-completion mock whose first choice carries ``content``."""
+    mock_choice = Mock()
+    mock_choice.message.content = content
+    mock_api_response = Mock()
+    mock_api_response.choices = [mock_choice]
+    return mock_api_response
+
+
+@pytest.fixture(scope="module")
+def ai_email_generator():
+    """Import the AI email generator only for the tests that exercise it."""
+    from app.services import ai_email_generator
+    return ai_email_generator
+
+
+@pytest.fixture
+def patched_openai(mocker, ai_email_generator):
+    """Patch call_openai_api once per test; tests set return_value or side_effect."""
+    return mocker.patch.object(ai_email_generator, 'call_openai_api')
+
+
 @pytest.mark.utils
 @pytest.mark.emails
 @pytest.mark.unit
 class TestGenerateEmail:
-    def test_successful_email_generation(self, mocker):
+    def test_successful_email_generation(self, ai_email_generator, patched_openai):
         """Test successful email generation with all required parameters."""
         # Arrange
-        expected_response = {
-            "subject": "Test Subject",
-            "body_text": "Test body text",
-            "body_html": "<p>Test body HTML</p>"
-        }
-        
-        # Mock the OpenAI API call
-        mock_api_response = Mock()
-        mock_choice = Mock()
-        mock_choice.message.content = json.dumps(expected_response)
-        mock_api_response.choices = [mock_choice]
-        
-        mocker.patch('app.services.ai_email_generator.call_openai_api', 
-                    return_value=mock_api_response)
+        patched_openai.return_value = _openai_response(_VALID_PAYLOAD)
         
         # Act
-        result = generate_email(
+        result = ai_email_generator.generate_email(
             recipient_name="John Doe",
             industry="Technology",
             pain_points=["Problem 1", "Problem 2"],
@@ -193,50 +212,35 @@ class TestGenerateEmail:
         )
         
         # Assert
-        assert result.subject == expected_response["subject"]
-        assert result.body_text == expected_response["body_text"]
-        assert result.body_html == expected_response["body_html"]
+        assert result.subject == _EXPECTED_EMAIL["subject"]
+        assert result.body_text == _EXPECTED_EMAIL["body_text"]
+        assert result.body_html == _EXPECTED_EMAIL["body_html"]
     
-    def test_minimal_parameters(self, mocker):
+    def test_minimal_parameters(self, ai_email_generator, patched_openai):
         """Test email generation with only required parameters."""
         # Arrange
-        expected_response = {
-            "subject": "Test Subject",
-            "body_text": "Test body text",
-            "body_html": "<p>Test body HTML</p>"
-        }
-        
-        # Mock the OpenAI API call
-        mock_api_response = Mock()
-        mock_choice = Mock()
-        mock_choice.message.content = json.dumps(expected_response)
-        mock_api_response.choices = [mock_choice]
-        
-        mocker.patch('app.services.ai_email_generator.call_openai_api', 
-                    return_value=mock_api_response)
+        patched_openai.return_value = _openai_response(_VALID_PAYLOAD)
         
         # Act
-        result = generate_email(
+        result = ai_email_generator.generate_email(
             recipient_name="John Doe",
             industry="Technology",
             pain_points=["Problem 1"]
         )
         
         # Assert
-        assert result.subject == expected_response["subject"]
-        assert result.body_text == expected_response["body_text"]
-        assert result.body_html == expected_response["body_html"]
+        assert result.subject == _EXPECTED_EMAIL["subject"]
+        assert result.body_text == _EXPECTED_EMAIL["body_text"]
+        assert result.body_html == _EXPECTED_EMAIL["body_html"]
     
-    def test_api_call_failure(self, mocker):
+    def test_api_call_failure(self, ai_email_generator, patched_openai):
         """Test that generate_email properly handles API call failure."""
         # Arrange
-        api_error = Exception("API connection error")
-        mocker.patch('app.services.ai_email_generator.call_openai_api', 
-                    side_effect=api_error)
+        patched_openai.side_effect = Exception("API connection error")
         
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
-            generate_email(
+            ai_email_generator.generate_email(
                 recipient_name="John Doe",
                 industry="Technology",
                 pain_points=["Problem 1"]
@@ -244,21 +248,14 @@ class TestGenerateEmail:
         
         assert "Failed to generate content" in str(exc_info.value)
     
-    def test_response_parsing_failure(self, mocker):
+    def test_response_parsing_failure(self, ai_email_generator, patched_openai):
         """Test that generate_email properly handles response parsing failure."""
         # Arrange
-        # Mock the OpenAI API call to return invalid JSON
-        mock_api_response = Mock()
-        mock_choice = Mock()
-        mock_choice.message.content = "Invalid JSON"
-        mock_api_response.choices = [mock_choice]
-        
-        mocker.patch('app.services.ai_email_generator.call_openai_api', 
-                    return_value=mock_api_response)
+        patched_openai.return_value = _openai_response("Invalid JSON")
         
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
-            generate_email(
+            ai_email_generator.generate_email(
                 recipient_name="John Doe",
                 industry="Technology",
                 pain_points=["Problem 1"]
@@ -266,26 +263,14 @@ class TestGenerateEmail:
         
         assert "Failed to parse AI response" in str(exc_info.value)
     
-    def test_missing_fields_in_response(self, mocker):
+    def test_missing_fields_in_response(self, ai_email_generator, patched_openai):
         """Test that generate_email properly handles response with missing fields."""
         # Arrange
-        incomplete_response = {
-            "subject": "Test Subject",
-            # Missing body_text and body_html
-        }
-        
-        # Mock the OpenAI API call
-        mock_api_response = Mock()
-        mock_choice = Mock()
-        mock_choice.message.content = json.dumps(incomplete_response)
-        mock_api_response.choices = [mock_choice]
-        
-        mocker.patch('app.services.ai_email_generator.call_openai_api', 
-                    return_value=mock_api_response)
+        patched_openai.return_value = _openai_response(_INCOMPLETE_PAYLOAD)
         
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
-            generate_email(
+            ai_email_generator.generate_email(
                 recipient_name="John Doe",
                 industry="Technology",
                 pain_points=["Problem 1"]